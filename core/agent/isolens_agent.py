@@ -106,6 +106,8 @@ class AgentState:
         self._last_error: Optional[str] = None
         self._started_at: str = datetime.datetime.now(datetime.UTC).isoformat().replace("+00:00", "Z")
         self._execution_count: int = 0
+        # Snapshot returned by to_dict(); dropped by every setter
+        self._snapshot: Optional[Dict[str, Any]] = None
 
     # -- read / write helpers --
 
@@ -118,36 +120,48 @@ class AgentState:
     def status(self, value: str) -> None:
         with self._lock:
             self._status = value
+            self._snapshot = None
 
     def set_executing(self, sample: str) -> None:
         with self._lock:
             self._status = self.EXECUTING
             self._current_sample = sample
+            self._snapshot = None
 
     def set_collecting(self) -> None:
         with self._lock:
             self._status = self.COLLECTING
+            self._snapshot = None
 
     def set_error(self, error: str) -> None:
         with self._lock:
             self._status = self.ERROR
             self._last_error = error
+            self._snapshot = None
 
     def set_idle(self) -> None:
         with self._lock:
             self._status = self.IDLE
             self._current_sample = None
             self._execution_count += 1
+            self._snapshot = None
 
     def to_dict(self) -> Dict[str, Any]:
+        """Return the current state as a dict.
+
+        The dict is rebuilt only after a setter has run, so repeated status
+        polls share one snapshot; callers must treat it as read-only.
+        """
         with self._lock:
-            return {
-                "status": self._status,
-                "current_sample": self._current_sample,
-                "last_error": self._last_error,
-                "started_at": self._started_at,
-                "execution_count": self._execution_count,
-            }
+            if self._snapshot is None:
+                self._snapshot = {
+                    "status": self._status,
+                    "current_sample": self._current_sample,
+                    "last_error": self._last_error,
+                    "started_at": self._started_at,
+                    "execution_count": self._execution_count,
+                }
+            return self._snapshot
 
 
 # ═══════════════════════════════════════════════════════════════════════════
@@ -920,6 +934,16 @@ class IsoLensAgent:
         Local directory for storing samples and collected artifacts.
     """
 
+    # Collectors in the order they run; instantiated per agent in __init__
+    _COLLECTOR_CLASSES = (
+        SysmonCollector,
+        ProcmonCollector,
+        NetworkCollector,
+        ScreenshotCollector,
+        TcpvconCollector,
+        HandleCollector,
+    )
+
     def __init__(self, share_path: str, workdir: str) -> None:
         self.share_path = share_path
         self.workdir = workdir
@@ -932,12 +956,7 @@ class IsoLensAgent:
 
         # Initialise collectors
         self.collectors: List[BaseCollector] = [
-            SysmonCollector(workdir),
-            ProcmonCollector(workdir),
-            NetworkCollector(workdir),
-            ScreenshotCollector(workdir),
-            TcpvconCollector(workdir),
-            HandleCollector(workdir),
+            cls(workdir) for cls in self._COLLECTOR_CLASSES
         ]
 
         log.info("Agent initialised  share=%s  workdir=%s", share_path, workdir)
@@ -1416,7 +1435,7 @@ class AgentHTTPHandler(BaseHTTPRequestHandler):
     # -- GET handlers --
 
     def _get_status(self) -> None:
-        data = self.agent.state.to_dict()
+        data = dict(self.agent.state.to_dict())
         data["agent_version"] = AGENT_VERSION
         data["platform"] = platform.platform()
         data["collectors"] = self.agent.get_collector_info()
@@ -1491,7 +1510,11 @@ def create_server(
     host: str = "0.0.0.0",
     port: int = 9090,
 ) -> HTTPServer:
-    """Build an HTTPServer bound to *host:port* with the given agent."""
+    """Build an HTTPServer bound to *host:port* with the given agent.
+
+    Pass ``port=0`` to bind an OS-assigned free port; read it back from
+    ``server.server_address[1]``.
+    """
     shutdown_event = threading.Event()
 
     # Dynamically create a handler subclass with agent & event attached
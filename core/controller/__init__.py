@@ -1,5 +1,5 @@
 """Controller layer for IsoLens."""
 
-from .vbox_controller import VBoxManageClient, CommandResult
+from .vbox_controller import AsyncVBoxManageClient, VBoxManageClient, CommandResult
 
-__all__ = ["VBoxManageClient", "CommandResult"]
+__all__ = ["AsyncVBoxManageClient", "VBoxManageClient", "CommandResult"]
@@ -3,11 +3,12 @@
 from __future__ import annotations
 
 import argparse
+import asyncio
 import json
 import subprocess
 import sys
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 
 @dataclass
@@ -73,6 +74,20 @@ class VBoxManageClient:
             raise RuntimeError(proc.stderr.strip() or "VBoxManage command failed")
         return result
 
+    def _run_bytes(self, args: List[str], *, timeout: Optional[int] = None) -> bytes:
+        """Run a command and return its raw stdout, raising on failure."""
+        cmd = [self.vboxmanage_path] + args
+        if self.dry_run:
+            return b""
+
+        proc = subprocess.run(cmd, capture_output=True, timeout=timeout, check=False)
+        if proc.returncode != 0:
+            raise RuntimeError(
+                proc.stderr.decode(errors="replace").strip()
+                or "VBoxManage command failed"
+            )
+        return proc.stdout
+
     def list_vms(self) -> CommandResult:
         return self._run(["list", "vms"])
 
@@ -146,6 +161,79 @@ class VBoxManageClient:
         """
         return self._run(["controlvm", vm, "screenshotpng", output_path])
 
+    def screenshot_vm_bytes(self, vm: str) -> bytes:
+        """Capture a live PNG screenshot and return the image bytes.
+
+        VBoxManage writes the PNG to /dev/stdout, so the frame is read off
+        the pipe without a temp file round-trip (POSIX hosts).
+        """
+        return self._run_bytes(["controlvm", vm, "screenshotpng", "/dev/stdout"])
+
+
+class AsyncVBoxManageClient(VBoxManageClient):
+    """VBoxManageClient that runs commands as asyncio subprocesses.
+
+    Every command method returns an awaitable of what the synchronous client
+    would return, so callers on an event loop (the gateway) don't tie up a worker thread
+    per VBoxManage invocation. The synchronous client is kept for the CLI.
+    """
+
+    async def _run(
+        self,
+        args: List[str],
+        *,
+        check: Optional[bool] = None,
+        timeout: Optional[int] = None,
+    ) -> CommandResult:
+        cmd = [self.vboxmanage_path] + args
+        if self.dry_run:
+            return CommandResult(cmd=cmd, returncode=0, stdout="", stderr="")
+
+        if check is None:
+            check = self.raise_on_error
+
+        returncode, out, err = await self._exec(cmd, timeout)
+        result = CommandResult(
+            cmd=cmd,
+            returncode=returncode,
+            stdout=out.decode(errors="replace"),
+            stderr=err.decode(errors="replace"),
+        )
+        if check and returncode != 0:
+            raise RuntimeError(result.stderr.strip() or "VBoxManage command failed")
+        return result
+
+    async def _run_bytes(
+        self, args: List[str], *, timeout: Optional[int] = None
+    ) -> bytes:
+        cmd = [self.vboxmanage_path] + args
+        if self.dry_run:
+            return b""
+
+        returncode, out, err = await self._exec(cmd, timeout)
+        if returncode != 0:
+            raise RuntimeError(
+                err.decode(errors="replace").strip() or "VBoxManage command failed"
+            )
+        return out
+
+    @staticmethod
+    async def _exec(
+        cmd: List[str], timeout: Optional[int]
+    ) -> Tuple[int, bytes, bytes]:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            out, err = await asyncio.wait_for(proc.communicate(), timeout)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        return proc.returncode, out, err
+
 
 def _print_result(result: CommandResult, *, as_json: bool) -> None:
     if as_json:
@@ -13,6 +13,8 @@ def build_arg_parser() -> argparse.ArgumentParser:
     parser.add_argument("--port", type=int, default=8000)
     parser.add_argument("--reload", action="store_true")
     parser.add_argument("--log-level", default="info")
+    parser.add_argument("--loop", default="uvloop", help="Event loop implementation")
+    parser.add_argument("--http", default="httptools", help="HTTP protocol implementation")
     return parser
 
 
@@ -24,6 +26,8 @@ def main(argv: list[str] | None = None) -> int:
         port=args.port,
         reload=args.reload,
         log_level=args.log_level,
+        loop=args.loop,
+        http=args.http,
     )
     return 0
 
@@ -25,22 +25,36 @@ import json
 import logging
 import os
 import shutil
+import stat
 import tempfile
+import threading
+from collections import OrderedDict
 from typing import Optional
 
-from fastapi import APIRouter, File, UploadFile
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, File, Request, Response, UploadFile
+from fastapi.responses import FileResponse, ORJSONResponse
 
 from core.controller.sandbox_orchestrator import (
     AgentConfig,
     SandboxOrchestrator,
     DEFAULT_REPORTS_DIR,
     DEFAULT_SAMPLES_DIR,
+    DEFAULT_SHARE_DIR,
 )
-from core.gateway.api_models import StandardResponse
+from core.gateway.api_models import ErrorPayload, StandardResponse
 
 log = logging.getLogger("isolens.analysis_routes")
 
+# Canonical reports root used for path-traversal checks
+_REPORTS_ROOT = os.path.realpath(DEFAULT_REPORTS_DIR)
+
+# ThreatAnalyzer's agent-reply cache for DEFAULT_REPORTS_DIR (its default
+# ``cache_dir``, next to the reports root)
+_AI_CACHE_DIR = os.path.join(os.path.dirname(DEFAULT_REPORTS_DIR), "ai_cache")
+
+# Lowercased extensions accepted as screenshot images
+_SS_EXTS = frozenset((".png", ".jpg", ".jpeg"))
+
 router = APIRouter(prefix="/api/analysis", tags=["analysis"])
 
 # Module-level orchestrator instance (lazy-initialised)
@@ -54,15 +68,17 @@ def _get_orchestrator() -> SandboxOrchestrator:
     return _orchestrator
 
 
+# Envelopes are built from server-side values, so model_construct skips the
+# construction-time validation pass.
 def _ok(data: dict) -> StandardResponse:
-    return StandardResponse(status="ok", data=data, error=None)
+    return StandardResponse.model_construct(status="ok", data=data, error=None)
 
 
 def _error(message: str, details: Optional[str] = None) -> StandardResponse:
-    return StandardResponse(
+    return StandardResponse.model_construct(
         status="error",
         data=None,
-        error={"message": message, "details": details},
+        error=ErrorPayload.model_construct(message=message, details=details),
     )
 
 
@@ -190,52 +206,155 @@ def agent_artifacts() -> StandardResponse:
 # ─── Report / screenshot serving ─────────────────────────────────────────
 
 
+def _weak_etag(st: os.stat_result) -> str:
+    """Build a weak ETag from a stat result's mtime and size."""
+    return f'W/"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Return True if the request's If-None-Match header matches *etag*."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return etag in (tag.strip() for tag in header.split(","))
+
+
+def _safe_report_path(analysis_id: str, *parts: str) -> Optional[str]:
+    """Resolve *parts* inside a report directory.
+
+    Returns None if the canonical path escapes that report's directory
+    (``..`` segments, absolute paths, or symlinks pointing elsewhere).
+    """
+    report_root = os.path.join(_REPORTS_ROOT, os.path.basename(analysis_id))
+    candidate = os.path.realpath(os.path.join(report_root, *parts))
+    if not candidate.startswith(report_root + os.sep):
+        return None
+    return candidate
+
+
+def _stat_regular_file(path: Optional[str]) -> Optional[os.stat_result]:
+    """Stat *path* once; return None unless it is an existing regular file."""
+    if path is None:
+        return None
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st if stat.S_ISREG(st.st_mode) else None
+
+
 @router.get("/report/{analysis_id}/screenshots")
-def list_screenshots(analysis_id: str):
-    """List screenshot files for an analysis."""
+def list_screenshots(analysis_id: str, request: Request, response: Response):
+    """List screenshot files for an analysis.
+
+    The directory mtime is used as a weak ETag so polling clients get a
+    ``304 Not Modified`` until a new screenshot lands.
+    """
     report_dir = os.path.join(DEFAULT_REPORTS_DIR, analysis_id, "screenshots")
     if not os.path.isdir(report_dir):
         return _ok({"screenshots": []})
-    files = sorted(
-        f for f in os.listdir(report_dir)
-        if f.lower().endswith((".png", ".jpg", ".jpeg"))
-    )
+    etag = _weak_etag(os.stat(report_dir))
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    with os.scandir(report_dir) as it:
+        files = sorted(
+            e.name for e in it
+            if os.path.splitext(e.name)[1].lower() in _SS_EXTS
+        )
+    response.headers["ETag"] = etag
     return _ok({"screenshots": files, "analysis_id": analysis_id})
 
 
 @router.get("/report/{analysis_id}/file/{filename:path}")
-def serve_report_file(analysis_id: str, filename: str):
-    """Serve a file from the analysis report directory (screenshots, logs, etc)."""
+def serve_report_file(analysis_id: str, filename: str, request: Request):
+    """Serve a file from the analysis report directory (screenshots, logs, etc).
+
+    Responds ``304 Not Modified`` when the client's ``If-None-Match``
+    matches the file's current ETag.
+    """
     # Security: prevent path traversal
-    safe_id = os.path.basename(analysis_id)
-    safe_name = os.path.normpath(filename)
-    if safe_name.startswith("..") or os.path.isabs(safe_name):
-        return JSONResponse(status_code=400, content={"error": "Invalid path"})
+    file_path = _safe_report_path(analysis_id, filename)
+    if file_path is None:
+        return ORJSONResponse(status_code=400, content={"error": "Invalid path"})
 
-    file_path = os.path.join(DEFAULT_REPORTS_DIR, safe_id, safe_name)
-    if not os.path.isfile(file_path):
+    st = _stat_regular_file(file_path)
+    if st is None:
         # Fallback: check inside artifacts/ subdirectory
-        file_path = os.path.join(DEFAULT_REPORTS_DIR, safe_id, "artifacts", safe_name)
-    if not os.path.isfile(file_path):
-        return JSONResponse(status_code=404, content={"error": "File not found"})
+        file_path = _safe_report_path(analysis_id, "artifacts", filename)
+        st = _stat_regular_file(file_path)
+    if st is None:
+        return ORJSONResponse(status_code=404, content={"error": "File not found"})
+
+    etag = _weak_etag(st)
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    # Hand the stat result through so Starlette doesn't stat the file again
+    return FileResponse(file_path, headers={"ETag": etag}, stat_result=st)
+
 
-    return FileResponse(file_path)
+# Parsed manifests keyed on (path, mtime_ns, size).  The orchestrator
+# rewrites a manifest whole, so any change shows up in the stat key.
+_MANIFEST_CACHE_MAX = 256
+_manifest_cache: "OrderedDict[tuple[str, int, int], dict]" = OrderedDict()
+_manifest_cache_lock = threading.Lock()
+
+
+def _read_manifest(path: str) -> Optional[dict]:
+    """Load one analysis manifest, returning None if it is unreadable.
+
+    The parsed dict is shared between callers and must not be mutated.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    key = (path, st.st_mtime_ns, st.st_size)
+    with _manifest_cache_lock:
+        data = _manifest_cache.get(key)
+        if data is not None:
+            _manifest_cache.move_to_end(key)
+            return data
+    try:
+        with open(path, "rb") as f:
+            data = json.loads(f.read())
+    except Exception:
+        return None
+    with _manifest_cache_lock:
+        _manifest_cache[key] = data
+        while len(_manifest_cache) > _MANIFEST_CACHE_MAX:
+            _manifest_cache.popitem(last=False)
+    return data
+
+
+def _manifest_paths() -> list[str]:
+    """Manifest path of every report directory, newest report id first."""
+    try:
+        with os.scandir(DEFAULT_REPORTS_DIR) as entries:
+            names = [e.name for e in entries if e.is_dir()]
+    except OSError:
+        return []
+    names.sort(reverse=True)
+    return [
+        os.path.join(DEFAULT_REPORTS_DIR, name, "analysis_manifest.json")
+        for name in names
+    ]
 
 
 @router.get("/reports/list", response_model=StandardResponse)
-def list_reports():
-    """List all analysis reports that have manifests."""
-    reports = []
-    if os.path.isdir(DEFAULT_REPORTS_DIR):
-        for entry in sorted(os.listdir(DEFAULT_REPORTS_DIR), reverse=True):
-            manifest = os.path.join(DEFAULT_REPORTS_DIR, entry, "analysis_manifest.json")
-            if os.path.isfile(manifest):
-                try:
-                    with open(manifest, "r") as f:
-                        data = json.load(f)
-                    reports.append(data)
-                except Exception:
-                    pass
+async def list_reports():
+    """List all analysis reports that have manifests.
+
+    The directory scan and the manifest reads all run in worker threads,
+    the reads concurrently, so a large report history neither blocks the
+    event loop nor serialises every open/read on a single worker.
+    """
+    manifest_paths = await asyncio.to_thread(_manifest_paths)
+    loaded = await asyncio.gather(
+        *(asyncio.to_thread(_read_manifest, p) for p in manifest_paths)
+    )
+    reports = [data for data in loaded if data is not None]
     return _ok({"reports": reports})
 
 
@@ -243,45 +362,48 @@ def list_reports():
 def clear_all_reports():
     """Delete all analysis reports and their associated data.
 
-    Removes all subdirectories in the reports directory and any result
-    zip files from SandboxShare/.
+    Removes all subdirectories in the reports directory, the cached AI
+    agent replies, and any result zip files from SandboxShare/.
     """
     deleted = 0
     errors = []
 
     # Remove report directories
     if os.path.isdir(DEFAULT_REPORTS_DIR):
-        for entry in os.listdir(DEFAULT_REPORTS_DIR):
-            entry_path = os.path.join(DEFAULT_REPORTS_DIR, entry)
-            if os.path.isdir(entry_path):
-                try:
-                    shutil.rmtree(entry_path)
-                    deleted += 1
-                except Exception as exc:
-                    errors.append(f"{entry}: {exc}")
+        with os.scandir(DEFAULT_REPORTS_DIR) as entries:
+            report_dirs = [e for e in entries if e.is_dir()]
+        for entry in report_dirs:
+            try:
+                shutil.rmtree(entry.path)
+                deleted += 1
+            except Exception as exc:
+                errors.append(f"{entry.name}: {exc}")
+
+    # Drop cached agent replies so a cleared report is never re-served from them
+    if os.path.isdir(_AI_CACHE_DIR):
+        try:
+            shutil.rmtree(_AI_CACHE_DIR)
+        except Exception as exc:
+            errors.append(f"ai_cache: {exc}")
 
     # Remove result zips from SandboxShare
-    sandbox_share = os.path.join(
-        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
-        "SandboxShare",
-    )
-    if os.path.isdir(sandbox_share):
-        for f in os.listdir(sandbox_share):
+    if os.path.isdir(DEFAULT_SHARE_DIR):
+        for f in os.listdir(DEFAULT_SHARE_DIR):
             if f.startswith("result_") and f.endswith(".zip"):
                 try:
-                    os.remove(os.path.join(sandbox_share, f))
+                    os.remove(os.path.join(DEFAULT_SHARE_DIR, f))
                 except Exception:
                     pass
 
     # Remove archived samples
     if os.path.isdir(DEFAULT_SAMPLES_DIR):
-        for f in os.listdir(DEFAULT_SAMPLES_DIR):
-            fpath = os.path.join(DEFAULT_SAMPLES_DIR, f)
-            if os.path.isfile(fpath):
-                try:
-                    os.remove(fpath)
-                except Exception as exc:
-                    errors.append(f"sample {f}: {exc}")
+        with os.scandir(DEFAULT_SAMPLES_DIR) as entries:
+            samples = [e for e in entries if e.is_file()]
+        for entry in samples:
+            try:
+                os.remove(entry.path)
+            except Exception as exc:
+                errors.append(f"sample {entry.name}: {exc}")
 
     # Reset the orchestrator's current analysis reference
     orch = _get_orchestrator()
@@ -338,7 +460,7 @@ def get_report_data(analysis_id: str):
     # Collect all data
     artifacts_dir = os.path.join(report_dir, "artifacts")
     data = {
-        "manifest": _read_json(os.path.join(report_dir, "analysis_manifest.json")),
+        "manifest": _read_manifest(os.path.join(report_dir, "analysis_manifest.json")),
         "metadata": _read_json(os.path.join(artifacts_dir, "metadata.json")),
         "sysmon": _read_json(os.path.join(artifacts_dir, "sysmon", "sysmon_summary.json")),
         "procmon": _read_json(os.path.join(artifacts_dir, "procmon", "procmon_summary.json")),
@@ -354,10 +476,12 @@ def get_report_data(analysis_id: str):
         os.path.join(artifacts_dir, "screenshots"),
     ]:
         if os.path.isdir(ss_dir):
-            for f in sorted(os.listdir(ss_dir)):
-                if f.lower().endswith((".png", ".jpg", ".jpeg")):
-                    screenshots.append(f)
-    data["screenshots"] = sorted(set(screenshots))
+            with os.scandir(ss_dir) as it:
+                for e in it:
+                    if os.path.splitext(e.name)[1].lower() in _SS_EXTS:
+                        screenshots.append(e.name)
+    # Dedupe names present in both locations, then sort once
+    data["screenshots"] = sorted(dict.fromkeys(screenshots))
 
     return _ok(data)
 
@@ -4,20 +4,35 @@ from __future__ import annotations
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from core.gateway.analysis_routes import router as analysis_router
 from core.gateway.controller_routes import router as controller_router
 from core.gateway.system_routes import router as system_router
 from core.gateway.version import VERSION
 
-app = FastAPI(title="IsoLens Gateway", version=VERSION)
+# Origins allowed to call the API directly.  The Next.js interface
+# normally proxies /api/* same-origin, so only its dev server is listed.
+CORS_ORIGINS = (
+    "http://localhost:3000",
+    "http://127.0.0.1:3000",
+)
+
+# orjson renders straight to bytes and is much faster than stdlib json
+# on large payloads such as the assembled report data.
+app = FastAPI(
+    title="IsoLens Gateway",
+    version=VERSION,
+    default_response_class=ORJSONResponse,
+)
 
-# Allow the Next.js dev server (and any localhost origin) to call the API
+# An explicit origin list (rather than "*" with credentials, which is
+# spec-invalid) lets the middleware build its CORS headers once.
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=list(CORS_ORIGINS),
     allow_credentials=True,
-    allow_methods=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
     allow_headers=["*"],
 )
 
@@ -2,14 +2,15 @@
 
 from __future__ import annotations
 
-import os
-import tempfile
-from typing import Optional
+import asyncio
+import functools
+import time
+from typing import Any, Optional
 
-from fastapi import APIRouter
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi import APIRouter, Response
+from fastapi.responses import ORJSONResponse
 
-from core.controller import VBoxManageClient
+from core.controller import AsyncVBoxManageClient
 from core.gateway.api_models import (
     SnapshotRequest,
     StandardResponse,
@@ -26,24 +27,146 @@ from core.modules.vbox_output_parser import (
 router = APIRouter(prefix="/api/vms", tags=["vms"])
 
 
-def _ok(data: dict) -> StandardResponse:
-    return StandardResponse(status="ok", data=data, error=None)
+# Handlers return ORJSONResponse directly: the payloads are built here from
+# known-good values, so FastAPI's response_model validation is skipped and
+# StandardResponse only documents the envelope in the OpenAPI schema.
+def _ok(data: dict) -> ORJSONResponse:
+    return ORJSONResponse({"status": "ok", "data": data, "error": None})
 
 
-def _error(message: str, details: Optional[str] = None) -> StandardResponse:
-    return StandardResponse(
-        status="error",
-        data=None,
-        error={"message": message, "details": details},
+def _error(
+    message: str, details: Optional[str] = None, *, status_code: int = 500
+) -> ORJSONResponse:
+    return ORJSONResponse(
+        status_code=status_code,
+        content={
+            "status": "error",
+            "data": None,
+            "error": {"message": message, "details": details},
+        },
     )
 
 
-def _client(dry_run: bool, raise_on_error: bool) -> VBoxManageClient:
-    return VBoxManageClient(dry_run=dry_run, raise_on_error=raise_on_error)
+@functools.lru_cache(maxsize=4)
+def _client(dry_run: bool, raise_on_error: bool) -> AsyncVBoxManageClient:
+    # The client only holds its constructor flags, so one instance per
+    # (dry_run, raise_on_error) pair is shared across requests.
+    return AsyncVBoxManageClient(dry_run=dry_run, raise_on_error=raise_on_error)
+
+
+# ─── Read cache ─────────────────────────────────────────────────────────
+# VM listings and showvminfo change rarely but cost a VBoxManage spawn, so
+# parsed results are kept for a few seconds. Everything runs on the event
+# loop, so no lock is needed; a read that was already awaiting VBoxManage
+# when an action invalidated the cache is caught by the generation check.
+
+_READ_CACHE_TTL = 5.0
+_READ_CACHE_MAX = 64
+# Results cheaper than this to produce aren't worth a cache slot.
+_READ_CACHE_MIN_COST = 0.01
+_read_cache: dict[tuple, tuple[float, Any]] = {}
+# Bumped by every invalidation; a read records it before awaiting VBoxManage.
+_read_generation = 0
+
+
+def _cache_get(key: tuple) -> Any:
+    entry = _read_cache.get(key)
+    if entry is None:
+        return None
+    stored_at, value = entry
+    if time.monotonic() - stored_at >= _READ_CACHE_TTL:
+        del _read_cache[key]
+        return None
+    return value
+
+
+def _cache_put(key: tuple, value: Any, *, started: float, generation: int) -> None:
+    """Store *value* if producing it (since *started*, perf_counter) was costly.
+
+    *generation* is ``_read_generation`` as read before the command ran; if
+    an action has invalidated the cache since, *value* may predate it and
+    is not stored.
+    """
+    if generation != _read_generation:
+        return
+    if time.perf_counter() - started < _READ_CACHE_MIN_COST:
+        return
+    _read_cache.pop(key, None)
+    if len(_read_cache) >= _READ_CACHE_MAX:
+        del _read_cache[next(iter(_read_cache))]
+    _read_cache[key] = (time.monotonic(), value)
+
+
+def _invalidate_vm_reads() -> None:
+    """Drop cached reads an action may have made stale.
+
+    The VM list itself only changes on (un)registration, but the running
+    list and every showvminfo entry are dropped — a VM may be addressed by
+    name or UUID, so entries can't be matched to the acted-on VM reliably.
+    Matching in-flight reads are forgotten too, so callers arriving after
+    the action start a new VBoxManage call instead of joining one that
+    began before it; callers already waiting still get their result.
+    """
+    global _read_generation
+    _read_generation += 1
+    for key in [k for k in _read_cache if k[0] != "vms"]:
+        del _read_cache[key]
+    for key in [k for k in _inflight if k[0] != "vms"]:
+        del _inflight[key]
+
+
+# ─── In-flight sharing ──────────────────────────────────────────────────
+# VBoxManage has no persistent session mode to pool, so the spawn cost is
+# amortized across callers instead: concurrent identical read-only calls
+# join the one already running rather than each starting a process.
+
+_inflight: dict[tuple, asyncio.Future] = {}
+
+
+def _inflight_done(key: tuple, task: asyncio.Future) -> None:
+    # The key may already hold a newer call if an action dropped this one
+    if _inflight.get(key) is task:
+        del _inflight[key]
+    if not task.cancelled():
+        task.exception()  # mark retrieved even if every waiter went away
+
+
+async def _shared(key: tuple, command, *args, **kwargs) -> Any:
+    """Await ``command(*args, **kwargs)``, joining an identical call in flight.
+
+    Only for read-only commands; *key* must capture everything that
+    affects the result, including the client flags.
+    """
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(command(*args, **kwargs))
+        _inflight[key] = task
+        task.add_done_callback(functools.partial(_inflight_done, key))
+    # shield: one caller disconnecting must not cancel the others' command
+    return await asyncio.shield(task)
+
+
+def vbox_route(handler):
+    """Wrap a handler returning a data dict in the standard envelope.
+
+    A RuntimeError raised by VBoxManage becomes a 500 error response, so
+    handlers only contain the happy path.
+    """
+
+    @functools.wraps(handler)
+    async def wrapper(*args, **kwargs) -> ORJSONResponse:
+        try:
+            return _ok(await handler(*args, **kwargs))
+        except RuntimeError as exc:
+            return _error("VBoxManage failed", str(exc))
+
+    return wrapper
 
 
 def _action_response(result, *, dry_run: bool) -> dict:
     """Build a response for action endpoints (start, poweroff, etc.)."""
+    if not dry_run:
+        _invalidate_vm_reads()
     data: dict = {
         "success": result.returncode == 0,
         "message": result.stdout.strip() or result.stderr.strip() or "OK",
@@ -54,252 +177,211 @@ def _action_response(result, *, dry_run: bool) -> dict:
 
 
 @router.get("", response_model=StandardResponse)
-def list_vms(dry_run: bool = False, raise_on_error: bool = True) -> StandardResponse:
-    try:
-        client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
-        result = client.list_vms()
-        data: dict = {"vms": parse_list_vms(result.stdout)}
-        if dry_run:
-            data["debug"] = result.to_dict()
-        return _ok(data)
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def list_vms(dry_run: bool = False, raise_on_error: bool = True) -> dict:
+    if not dry_run:
+        cached = _cache_get(("vms",))
+        if cached is not None:
+            return {"vms": cached}
+    started, generation = time.perf_counter(), _read_generation
+    client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
+    result = await _shared(("vms", dry_run, raise_on_error), client.list_vms)
+    vms = parse_list_vms(result.stdout)
+    data: dict = {"vms": vms}
+    if dry_run:
+        data["debug"] = result.to_dict()
+    elif result.returncode == 0:
+        _cache_put(("vms",), vms, started=started, generation=generation)
+    return data
 
 
 @router.get("/running", response_model=StandardResponse)
-def list_running_vms(
+@vbox_route
+async def list_running_vms(
     dry_run: bool = False, raise_on_error: bool = True
-) -> StandardResponse:
-    try:
-        client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
-        result = client.list_running_vms()
-        data: dict = {"vms": parse_list_vms(result.stdout)}
-        if dry_run:
-            data["debug"] = result.to_dict()
-        return _ok(data)
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+) -> dict:
+    if not dry_run:
+        cached = _cache_get(("running",))
+        if cached is not None:
+            return {"vms": cached}
+    started, generation = time.perf_counter(), _read_generation
+    client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
+    result = await _shared(
+        ("running", dry_run, raise_on_error), client.list_running_vms
+    )
+    vms = parse_list_vms(result.stdout)
+    data: dict = {"vms": vms}
+    if dry_run:
+        data["debug"] = result.to_dict()
+    elif result.returncode == 0:
+        _cache_put(("running",), vms, started=started, generation=generation)
+    return data
 
 
 @router.get("/ip", response_model=StandardResponse)
-def vm_ip_addresses(
+@vbox_route
+async def vm_ip_addresses(
     vm: str, dry_run: bool = False, raise_on_error: bool = True
-) -> StandardResponse:
+) -> dict:
     """Return all network interface IPs for a given VM via Guest Additions.
 
     Requires VirtualBox Guest Additions to be installed and running inside the VM.
     """
-    try:
-        client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
-        result = client.get_vm_ip_addresses(vm)
-        interfaces = parse_guest_net_properties(result.stdout)
-        data: dict = {"vm": vm, "interfaces": interfaces}
-        if dry_run:
-            data["debug"] = result.to_dict()
-        return _ok(data)
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+    client = _client(dry_run=dry_run, raise_on_error=raise_on_error)
+    result = await _shared(
+        ("ip", vm, dry_run, raise_on_error), client.get_vm_ip_addresses, vm
+    )
+    interfaces = parse_guest_net_properties(result.stdout)
+    data: dict = {"vm": vm, "interfaces": interfaces}
+    if dry_run:
+        data["debug"] = result.to_dict()
+    return data
 
 
 @router.post("/info", response_model=StandardResponse)
-def vm_info(payload: VMInfoRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.show_vm_info(payload.vm, machinereadable=payload.machinereadable)
-        if payload.machinereadable:
-            parsed = parse_showvminfo(result.stdout)
-        else:
-            parsed = {"raw_text": result.stdout}
-        data: dict = {"info": parsed}
-        if payload.dry_run:
-            data["debug"] = result.to_dict()
-        return _ok(data)
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_info(payload: VMInfoRequest) -> dict:
+    key = ("info", payload.vm, payload.machinereadable)
+    if not payload.dry_run:
+        cached = _cache_get(key)
+        if cached is not None:
+            return {"info": cached}
+    started, generation = time.perf_counter(), _read_generation
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await _shared(
+        key + (payload.dry_run, payload.raise_on_error),
+        client.show_vm_info,
+        payload.vm,
+        machinereadable=payload.machinereadable,
+    )
+    if payload.machinereadable:
+        parsed = parse_showvminfo(result.stdout)
+    else:
+        parsed = {"raw_text": result.stdout}
+    data: dict = {"info": parsed}
+    if payload.dry_run:
+        data["debug"] = result.to_dict()
+    elif result.returncode == 0:
+        _cache_put(key, parsed, started=started, generation=generation)
+    return data
 
 
 @router.post("/start", response_model=StandardResponse)
-def vm_start(payload: VMStartRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.start_vm(payload.vm, headless=payload.headless)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_start(payload: VMStartRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.start_vm(payload.vm, headless=payload.headless)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/poweroff", response_model=StandardResponse)
-def vm_poweroff(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.poweroff_vm(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_poweroff(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.poweroff_vm(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/savestate", response_model=StandardResponse)
-def vm_savestate(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.savestate_vm(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_savestate(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.savestate_vm(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/pause", response_model=StandardResponse)
-def vm_pause(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.pause_vm(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_pause(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.pause_vm(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/resume", response_model=StandardResponse)
-def vm_resume(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.resume_vm(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_resume(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.resume_vm(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/reset", response_model=StandardResponse)
-def vm_reset(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.reset_vm(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_reset(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.reset_vm(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/shutdown", response_model=StandardResponse)
-def vm_shutdown(payload: VMControlRequest, force: bool = False) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.shutdown_vm(payload.vm, force=force)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def vm_shutdown(payload: VMControlRequest, force: bool = False) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.shutdown_vm(payload.vm, force=force)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/snapshot/take", response_model=StandardResponse)
-def snapshot_take(payload: SnapshotRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.snapshot_take(payload.vm, payload.name)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def snapshot_take(payload: SnapshotRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.snapshot_take(payload.vm, payload.name)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/snapshot/restore", response_model=StandardResponse)
-def snapshot_restore(payload: SnapshotRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.snapshot_restore(payload.vm, payload.name)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def snapshot_restore(payload: SnapshotRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.snapshot_restore(payload.vm, payload.name)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 @router.post("/snapshot/restore-current", response_model=StandardResponse)
-def snapshot_restore_current(payload: VMControlRequest) -> StandardResponse:
-    try:
-        client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
-        result = client.snapshot_restore_current(payload.vm)
-        return _ok(_action_response(result, dry_run=payload.dry_run))
-    except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+@vbox_route
+async def snapshot_restore_current(payload: VMControlRequest) -> dict:
+    client = _client(dry_run=payload.dry_run, raise_on_error=payload.raise_on_error)
+    result = await client.snapshot_restore_current(payload.vm)
+    return _action_response(result, dry_run=payload.dry_run)
 
 
 # ─── Live VM screenshot ─────────────────────────────────────────────────
 
-# Reusable temp file for the live screenshot (avoids creating many temp files)
-_SCREEN_TMP = os.path.join(tempfile.gettempdir(), "isolens_live_screen.png")
+# The UI polls this endpoint for a live view; frames captured within this
+# window are served from memory instead of spawning another capture.
+_SCREEN_TTL = 0.2
+_screen_cache: dict[str, tuple[float, bytes]] = {}
+
+_NOCACHE_HEADERS = {
+    "Cache-Control": "no-cache, no-store, must-revalidate",
+    "Pragma": "no-cache",
+    "Expires": "0",
+}
 
 
 @router.get("/screen")
-def vm_live_screenshot(vm: str = "WindowsSandbox"):
+async def vm_live_screenshot(vm: str = "WindowsSandbox"):
     """Capture and serve a live PNG screenshot of the VM display.
 
     Returns the raw PNG image with proper content-type headers and
     cache-control to prevent stale frames.
     """
+    cached = _screen_cache.get(vm)
+    if cached and time.monotonic() - cached[0] < _SCREEN_TTL:
+        return Response(cached[1], media_type="image/png", headers=_NOCACHE_HEADERS)
+
     try:
         client = _client(dry_run=False, raise_on_error=True)
-        result = client.screenshot_vm(vm, _SCREEN_TMP)
-        if result.returncode != 0:
-            return JSONResponse(
-                status_code=500,
-                content=_error(
-                    "Screenshot failed",
-                    result.stderr.strip() or result.stdout.strip(),
-                ).model_dump(),
-            )
-        if not os.path.isfile(_SCREEN_TMP):
-            return JSONResponse(
-                status_code=500,
-                content=_error("Screenshot file not created").model_dump(),
-            )
-        return FileResponse(
-            _SCREEN_TMP,
-            media_type="image/png",
-            headers={
-                "Cache-Control": "no-cache, no-store, must-revalidate",
-                "Pragma": "no-cache",
-                "Expires": "0",
-            },
-        )
+        png = await _shared(("screen", vm), client.screenshot_vm_bytes, vm)
     except RuntimeError as exc:
-        return JSONResponse(
-            status_code=500,
-            content=_error("VBoxManage failed", str(exc)).model_dump(),
-        )
+        return _error("Screenshot failed", str(exc))
+    if not png:
+        return _error("Screenshot returned no image data")
+    # ``vm`` is free-form, so frames past their TTL are dropped on every
+    # store; otherwise each name ever polled would pin a PNG in memory.
+    now = time.monotonic()
+    for name in [n for n, (at, _) in _screen_cache.items() if now - at >= _SCREEN_TTL]:
+        del _screen_cache[name]
+    _screen_cache[vm] = (now, png)
+    return Response(png, media_type="image/png", headers=_NOCACHE_HEADERS)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
 
 from core.gateway.api_models import StandardResponse
 from core.gateway.version import VERSION
@@ -10,15 +11,21 @@ from core.gateway.version import VERSION
 router = APIRouter(prefix="/api", tags=["system"])
 
 
-def _ok(data: dict) -> StandardResponse:
-    return StandardResponse(status="ok", data=data, error=None)
+def _ok(data: dict) -> ORJSONResponse:
+    return ORJSONResponse({"status": "ok", "data": data, "error": None})
+
+
+# Both payloads are constant, so the serialized responses are built once
+# at import and handed back as-is on every request.
+_PONG = _ok({"message": "pong"})
+_VERSION = _ok({"version": VERSION})
 
 
 @router.get("/ping", response_model=StandardResponse)
-def ping() -> StandardResponse:
-    return _ok({"message": "pong"})
+async def ping() -> ORJSONResponse:
+    return _PONG
 
 
 @router.get("/version", response_model=StandardResponse)
-def version() -> StandardResponse:
-    return _ok({"version": VERSION})
+async def version() -> ORJSONResponse:
+    return _VERSION
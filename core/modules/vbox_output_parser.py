@@ -7,56 +7,66 @@ identity, state, resources, networking, snapshots, and shared folders.
 from __future__ import annotations
 
 import re
+from dataclasses import dataclass
 from typing import Any
 
 
-def parse_list_vms(stdout: str) -> list[dict[str, str]]:
+@dataclass(frozen=True, slots=True)
+class VMRef:
+    """One row of `list vms` output; serialized by orjson as {"name", "uuid"}."""
+
+    name: str
+    uuid: str
+
+
+_LIST_RE = re.compile(
+    r'^[^\S\n]*"(.+)"[^\S\n]+\{([0-9a-fA-F-]+)\}[^\S\n]*$', re.MULTILINE
+)
+
+
+def parse_list_vms(stdout: str) -> list[VMRef]:
     """Parse `VBoxManage list vms` / `list runningvms` output.
 
-    Returns: [{"name": "...", "uuid": "..."}]
+    Returns: [VMRef(name="...", uuid="...")]
     """
-    results: list[dict[str, str]] = []
-    for line in stdout.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        match = re.match(r'^"(.+)"\s+\{([0-9a-fA-F-]+)\}$', line)
-        if match:
-            results.append({"name": match.group(1), "uuid": match.group(2)})
-    return results
+    return [VMRef(m.group(1), m.group(2)) for m in _LIST_RE.finditer(stdout)]
 
 
 # ---------------------------------------------------------------------------
 # Value helpers
 # ---------------------------------------------------------------------------
 
+_BOOL_VALUES = {
+    "on": True, "off": False,
+    "true": True, "false": False,
+    "enabled": True, "disabled": False,
+}
+
+
 def _coerce(raw: str) -> Any:
     """Convert a machinereadable value to a Python-native type."""
-    if raw in {"on", "off"}:
-        return raw == "on"
-    if raw in {"true", "false"}:
-        return raw == "true"
-    if raw in {"enabled", "disabled"}:
-        return raw == "enabled"
+    flag = _BOOL_VALUES.get(raw)
+    if flag is not None:
+        return flag
     try:
         return int(raw)
     except ValueError:
         return raw
 
 
+# One match per key=value line: the key runs up to the first "=", the value
+# to the end of the line. Scanning the whole buffer keeps the line loop in C.
+_KV_RE = re.compile(r"^([^=\n]*)=(.*)$", re.MULTILINE)
+
+
 def _parse_raw(stdout: str) -> dict[str, Any]:
     """Parse key=value lines from machinereadable output into a flat dict."""
     data: dict[str, Any] = {}
-    for line in stdout.splitlines():
-        line = line.strip()
-        if not line or "=" not in line:
-            continue
-        key, value = line.split("=", 1)
-        key = key.strip().strip('"')
+    for key, value in _KV_RE.findall(stdout):
         value = value.strip()
         if value.startswith('"') and value.endswith('"'):
             value = value[1:-1].replace('\\"', '"')
-        data[key] = _coerce(value)
+        data[key.strip().strip('"')] = _coerce(value)
     return data
 
 
@@ -68,6 +78,9 @@ _NIC_RE = re.compile(
     r"^(nic|macaddress|cableconnected|natnet|hostonlyadapter|bridgeadapter)(\d+)$"
 )
 _SF_RE = re.compile(r"^SharedFolder(Name|Path)GlobalMapping(\d+)$")
+_NIC_PREFIXES = (
+    "nic", "macaddress", "cableconnected", "natnet", "hostonlyadapter", "bridgeadapter",
+)
 
 
 def parse_showvminfo(stdout: str) -> dict[str, Any]:
@@ -110,21 +123,34 @@ def parse_showvminfo(stdout: str) -> dict[str, Any]:
     # --- Audio ---
     info["audio_enabled"] = raw.get("audioEnabled" if "audioEnabled" in raw else "audio")
 
-    # --- Network (enabled NICs only) ---
-    nic_data: dict[str, dict[str, Any]] = {}
+    # --- NIC / shared folder keys, gathered in one pass ---
+    # A cheap prefix test gates the regex so unrelated keys never reach it.
+    nic_data: dict[int, dict[str, Any]] = {}
+    sf_names: dict[int, str] = {}
+    sf_paths: dict[int, str] = {}
     for key, value in raw.items():
-        m = _NIC_RE.match(key)
-        if m:
-            prop, idx = m.group(1), m.group(2)
-            nic_data.setdefault(idx, {})[prop] = value
+        if key.startswith(_NIC_PREFIXES):
+            m = _NIC_RE.match(key)
+            if m:
+                prop, idx = m.group(1), int(m.group(2))
+                nic_data.setdefault(idx, {})[prop] = value
+        elif key.startswith("SharedFolder"):
+            m = _SF_RE.match(key)
+            if m:
+                prop, idx = m.group(1), int(m.group(2))
+                if prop == "Name":
+                    sf_names[idx] = value
+                else:
+                    sf_paths[idx] = value
 
+    # --- Network (enabled NICs only) ---
     nics: list[dict[str, Any]] = []
-    for idx in sorted(nic_data, key=int):
+    for idx in sorted(nic_data):
         nic = nic_data[idx]
         if nic.get("nic") == "none":
             continue
         nics.append({
-            "slot": int(idx),
+            "slot": idx,
             "type": nic.get("nic"),
             "mac": nic.get("macaddress"),
             "cable": nic.get("cableconnected"),
@@ -141,20 +167,9 @@ def parse_showvminfo(stdout: str) -> dict[str, Any]:
     info["snapshot_uuid"] = raw.get("CurrentSnapshotUUID")
 
     # --- Shared folders ---
-    sf_names: dict[str, str] = {}
-    sf_paths: dict[str, str] = {}
-    for key, value in raw.items():
-        m = _SF_RE.match(key)
-        if m:
-            prop, idx = m.group(1), m.group(2)
-            if prop == "Name":
-                sf_names[idx] = value
-            else:
-                sf_paths[idx] = value
-
     info["shared_folders"] = [
         {"name": sf_names[i], "path": sf_paths.get(i, "")}
-        for i in sorted(sf_names, key=int)
+        for i in sorted(sf_names)
     ]
 
     return info
@@ -177,12 +192,11 @@ def parse_snapshot_list(stdout: str) -> dict[str, Any]:
         if key == "CurrentSnapshotName":
             current_name = value
             continue
-        for prefix in ("SnapshotName", "SnapshotUUID"):
-            if key.startswith(prefix):
-                suffix = key[len(prefix):]
-                prop = "name" if "Name" in prefix else "uuid"
-                entries.setdefault(suffix, {})[prop] = value
-                break
+        # Both prefixes are 12 characters; the rest is the snapshot's path suffix.
+        if key.startswith("SnapshotName"):
+            entries.setdefault(key[12:], {})["name"] = value
+        elif key.startswith("SnapshotUUID"):
+            entries.setdefault(key[12:], {})["uuid"] = value
 
     return {
         "snapshots": [entries[s] for s in sorted(entries)],
@@ -195,8 +209,15 @@ def parse_snapshot_list(stdout: str) -> dict[str, Any]:
 # ---------------------------------------------------------------------------
 
 _GUEST_PROP_RE = re.compile(
-    r"/VirtualBox/GuestInfo/Net/(\d+)/([^\s]+)\s+=\s+'([^']*)'"
+    r"/VirtualBox/GuestInfo/Net/(\d+)/([^\s]+)[ \t]+=[ \t]+'([^'\n]*)'"
 )
+_GUEST_NET_FIELDS = {
+    "V4/IP": "ip",
+    "V4/Netmask": "netmask",
+    "V4/Broadcast": "broadcast",
+    "Status": "status",
+    "MAC": "mac",
+}
 
 
 def parse_guest_net_properties(stdout: str) -> list[dict[str, Any]]:
@@ -212,21 +233,11 @@ def parse_guest_net_properties(stdout: str) -> list[dict[str, Any]]:
     """
     interfaces: dict[int, dict[str, Any]] = {}
 
-    for line in stdout.splitlines():
-        m = _GUEST_PROP_RE.search(line)
-        if not m:
-            continue
-        idx, key, value = int(m.group(1)), m.group(2), m.group(3)
+    for m in _GUEST_PROP_RE.finditer(stdout):
+        idx = int(m.group(1))
         iface = interfaces.setdefault(idx, {"interface": idx})
-        if key == "V4/IP":
-            iface["ip"] = value
-        elif key == "V4/Netmask":
-            iface["netmask"] = value
-        elif key == "V4/Broadcast":
-            iface["broadcast"] = value
-        elif key == "Status":
-            iface["status"] = value
-        elif key == "MAC":
-            iface["mac"] = value
+        field = _GUEST_NET_FIELDS.get(m.group(2))
+        if field:
+            iface[field] = m.group(3)
 
     return [interfaces[i] for i in sorted(interfaces)]
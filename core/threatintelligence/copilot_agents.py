@@ -9,8 +9,13 @@ All agents MUST use the ``gpt-5-mini`` model (enforced by CopilotService).
 
 from __future__ import annotations
 
+import json
+import string
+import sys
 from dataclasses import dataclass
 
+import orjson
+
 
 @dataclass(frozen=True)
 class ThreatIntelAgent:
@@ -34,6 +39,8 @@ class ThreatIntelAgent:
 
 # ????????? Shared JSON contract preamble ?????????????????????????????????????????????????????????????????????????????????????????????????????????????????????
 
+# Every prompt leads with these rules and its schema, and only then the
+# agent's role text, so the invariant head is a shared, cacheable prefix.
 _JSON_RULES = (
     "CRITICAL RULES:\n"
     "1. You MUST respond ONLY with a single valid JSON object. No markdown, no code fences, no prose before or after.\n"
@@ -46,8 +53,10 @@ _JSON_RULES = (
     "8. Do NOT wrap the JSON in ```json``` code fences.\n"
 )
 
-_TOOL_OUTPUT_SCHEMA = """{
-  "tool": "{TOOL_NAME}",
+# ``$TOOL_NAME`` is a string.Template placeholder, which can't collide with
+# the JSON braces the way a str.format field would.
+_TOOL_OUTPUT_SCHEMA = string.Template("""{
+  "tool": "$TOOL_NAME",
   "verdict": "malicious|suspicious|benign|inconclusive",
   "confidence": 0,
   "findings": [
@@ -64,7 +73,25 @@ _TOOL_OUTPUT_SCHEMA = """{
     }
   ],
   "summary": "2-3 sentence summary of this tool's analysis"
-}"""
+}""")
+
+# The schema as substituted for each tool analyst, keyed by tool name.
+_TOOL_SCHEMAS: dict[str, str] = {
+    tool: _TOOL_OUTPUT_SCHEMA.substitute(TOOL_NAME=tool)
+    for tool in ("sysmon", "procmon", "network", "handle", "tcpvcon", "metadata")
+}
+
+
+def _build_tool_prompt(role_text: str, tool_name: str) -> str:
+    """Compose a tool analyst prompt: shared rules and schema, then the role."""
+    return sys.intern("".join((
+        _JSON_RULES,
+        "\nRespond using this EXACT JSON schema (max 10 findings):\n",
+        _TOOL_SCHEMAS[tool_name],
+        "\n---\n",
+        role_text,
+    )))
+
 
 # ????????? Per-tool analyst agents ???????????????????????????????????????????????????????????????????????????????????????????????????????????????????????????????????????
 
@@ -72,7 +99,7 @@ SYSMON_AGENT = ThreatIntelAgent(
     name="sysmon-analyzer",
     display_name="Sysmon Analyzer",
     description="Analyzes Windows Sysmon event log data for malicious behavior indicators.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert Sysmon log analyst specializing in malware behavioral detection.\n"
         "You will receive Sysmon event summary data from a sandbox execution.\n\n"
         "Focus on:\n"
@@ -82,10 +109,8 @@ SYSMON_AGENT = ThreatIntelAgent(
         "- File creation in sensitive directories (System32, Temp, AppData)\n"
         "- Registry modifications for persistence (Run keys, services)\n"
         "- Named pipe creation/access patterns\n"
-        "- DNS queries to suspicious domains\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "sysmon")
+        "- DNS queries to suspicious domains\n\n",
+        "sysmon",
     ),
 )
 
@@ -93,7 +118,7 @@ PROCMON_AGENT = ThreatIntelAgent(
     name="procmon-analyzer",
     display_name="Procmon Analyzer",
     description="Analyzes Process Monitor data for file, registry, and process activity.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert Process Monitor analyst specializing in malware behavioral analysis.\n"
         "You will receive a procmon_summary.json with file activity, registry activity, "
         "network activity, and process trees from a sandbox execution.\n\n"
@@ -105,10 +130,8 @@ PROCMON_AGENT = ThreatIntelAgent(
         "- .NET runtime loading patterns (may indicate managed malware)\n"
         "- Creation of batch files, scripts, or executables\n"
         "- Temp directory usage patterns\n"
-        "- Total event volume vs sample events ratio (high ratio = noisy malware)\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "procmon")
+        "- Total event volume vs sample events ratio (high ratio = noisy malware)\n\n",
+        "procmon",
     ),
 )
 
@@ -116,7 +139,7 @@ NETWORK_AGENT = ThreatIntelAgent(
     name="network-analyzer",
     display_name="Network Analyzer",
     description="Analyzes captured network traffic for C2 communication and data exfiltration.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert network traffic analyst specializing in malware C2 detection.\n"
         "You will receive network capture summary data including TCP conversations, "
         "DNS queries, and HTTP requests from a sandbox execution.\n\n"
@@ -128,10 +151,8 @@ NETWORK_AGENT = ThreatIntelAgent(
         "- Large data transfers suggesting exfiltration\n"
         "- Connections to known-bad infrastructure patterns\n"
         "- IMPORTANT: Filter out IsoLens agent traffic (192.168.56.105:9090 /api/*) as benign infrastructure\n"
-        "- IMPORTANT: Filter out mDNS/SSDP/LLMNR as normal OS noise\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "network")
+        "- IMPORTANT: Filter out mDNS/SSDP/LLMNR as normal OS noise\n\n",
+        "network",
     ),
 )
 
@@ -139,7 +160,7 @@ HANDLE_AGENT = ThreatIntelAgent(
     name="handle-analyzer",
     display_name="Handle Analyzer",
     description="Analyzes open file/registry/mutex handles for persistence and evasion indicators.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert Windows handle analyst specializing in malware persistence detection.\n"
         "You will receive Sysinternals Handle tool output showing open handles "
         "held by the sample process during sandbox execution.\n\n"
@@ -150,10 +171,8 @@ HANDLE_AGENT = ThreatIntelAgent(
         "- Open handles to other process memory (possible injection)\n"
         "- File handles in temp directories or user profile paths\n"
         "- Log files or configuration files created by the sample\n"
-        "- Handles to network-related objects\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "handle")
+        "- Handles to network-related objects\n\n",
+        "handle",
     ),
 )
 
@@ -161,7 +180,7 @@ TCPVCON_AGENT = ThreatIntelAgent(
     name="tcpvcon-analyzer",
     display_name="TCPVcon Analyzer",
     description="Analyzes active TCP/UDP connections snapshot for C2 and lateral movement.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert network connection analyst specializing in identifying "
         "malware command-and-control channels.\n"
         "You will receive TCPVcon snapshot data (CSV format) showing active TCP/UDP "
@@ -172,10 +191,8 @@ TCPVCON_AGENT = ThreatIntelAgent(
         "- Connections to unusual port numbers\n"
         "- Multiple connections suggesting beaconing or distributed C2\n"
         "- IMPORTANT: Filter out IsoLens agent connections (port 9090) as benign\n"
-        "- IMPORTANT: Filter out standard Windows services unless sample owns them\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "tcpvcon")
+        "- IMPORTANT: Filter out standard Windows services unless sample owns them\n\n",
+        "tcpvcon",
     ),
 )
 
@@ -183,7 +200,7 @@ METADATA_AGENT = ThreatIntelAgent(
     name="metadata-analyzer",
     display_name="Metadata Analyzer",
     description="Analyzes execution metadata and collector status for anomalies.",
-    prompt=(
+    prompt=_build_tool_prompt(
         "You are an expert sandbox analysis reviewer.\n"
         "You will receive metadata about a sandbox execution including sample name, "
         "execution timestamp, timeout settings, and collector availability.\n\n"
@@ -192,10 +209,8 @@ METADATA_AGENT = ThreatIntelAgent(
         "- Collector failures that might indicate anti-analysis/evasion techniques\n"
         "- Execution timing anomalies\n"
         "- Whether the sample was a .exe, .dll, .bat, .ps1 etc and implications\n"
-        "- Missing data that might indicate sandbox detection and evasion\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema (max 10 findings):\n"
-        + _TOOL_OUTPUT_SCHEMA.replace("{TOOL_NAME}", "metadata")
+        "- Missing data that might indicate sandbox detection and evasion\n\n",
+        "metadata",
     ),
 )
 
@@ -248,7 +263,11 @@ THREAT_SUMMARIZER_AGENT = ThreatIntelAgent(
     display_name="Threat Summarizer",
     description="Produces final risk score, classification, and executive summary from all tool analyses.",
     prompt=(
-        "You are a senior threat intelligence analyst producing the FINAL assessment report.\n"
+        _JSON_RULES
+        + "\nRespond using this EXACT JSON schema:\n"
+        + _SUMMARY_SCHEMA
+        + "\n---\n"
+        + "You are a senior threat intelligence analyst producing the FINAL assessment report.\n"
         "You will receive JSON analysis outputs from multiple specialized tool analysts "
         "(sysmon, procmon, network, handle, tcpvcon, metadata). Each was produced by "
         "an expert analyzing one data source from the same sandbox execution.\n\n"
@@ -270,9 +289,6 @@ THREAT_SUMMARIZER_AGENT = ThreatIntelAgent(
         "If a tool returned no data or inconclusive, note it but don't penalize the score.\n\n"
         "Include the 5-10 most important findings across all tools in key_findings.\n"
         "Include 3-5 actionable recommendations.\n\n"
-        + _JSON_RULES
-        + "\nRespond using this EXACT JSON schema:\n"
-        + _SUMMARY_SCHEMA
     ),
 )
 
@@ -295,20 +311,67 @@ DEFAULT_THREATINTEL_AGENTS: tuple[ThreatIntelAgent, ...] = (
     THREAT_SUMMARIZER_AGENT,
 )
 
+# Wire-format configs for every default agent. The agents are frozen, so
+# this is built once here instead of on every session.
+DEFAULT_CUSTOM_AGENTS_CONFIG: tuple[dict[str, object], ...] = tuple(
+    agent.to_custom_agent_config() for agent in DEFAULT_THREATINTEL_AGENTS
+)
+
+_AGENTS_BY_NAME: dict[str, ThreatIntelAgent] = {
+    agent.name: agent for agent in DEFAULT_THREATINTEL_AGENTS
+}
+
+
+# Top-level keys each agent's JSON reply must carry, read off the same
+# schema text the prompts embed so the two cannot drift apart.
+_TOOL_OUTPUT_KEYS = frozenset(json.loads(_TOOL_OUTPUT_SCHEMA.template))
+_SUMMARY_OUTPUT_KEYS = frozenset(json.loads(_SUMMARY_SCHEMA))
+
+OUTPUT_KEYS_BY_AGENT: dict[str, frozenset[str]] = {
+    **{agent.name: _TOOL_OUTPUT_KEYS for agent in TOOL_AGENTS},
+    THREAT_SUMMARIZER_AGENT.name: _SUMMARY_OUTPUT_KEYS,
+}
+
 
-def list_default_agents() -> list[ThreatIntelAgent]:
+def inconclusive_tool_reply(tool: str, summary: str) -> str:
+    """JSON reply standing in for a tool analyst that produced no analysis.
+
+    Shaped like a real tool reply, so the summarizer still sees every tool.
+    """
+    return orjson.dumps({
+        "tool": tool,
+        "verdict": "inconclusive",
+        "confidence": 0,
+        "findings": [],
+        "iocs": [],
+        "summary": summary,
+    }).decode()
+
+
+# ``/agent <name>\n`` slash-command prefix for each default agent.
+_AGENT_SWITCH_PREFIX: dict[str, str] = {
+    agent.name: sys.intern(f"/agent {agent.name}\n") for agent in DEFAULT_THREATINTEL_AGENTS
+}
+
+
+def list_default_agents() -> tuple[ThreatIntelAgent, ...]:
     """Return all supported local threat-intel agent definitions."""
-    return list(DEFAULT_THREATINTEL_AGENTS)
+    return DEFAULT_THREATINTEL_AGENTS
 
 
-def get_tool_agents() -> list[ThreatIntelAgent]:
+def get_tool_agents() -> tuple[ThreatIntelAgent, ...]:
     """Return only the per-tool analyzer agents (not the summarizer)."""
-    return list(TOOL_AGENTS)
+    return TOOL_AGENTS
 
 
 def get_agent_by_name(name: str) -> ThreatIntelAgent | None:
     """Look up an agent by its ``name`` field."""
-    for agent in DEFAULT_THREATINTEL_AGENTS:
-        if agent.name == name:
-            return agent
-    return None
+    return _AGENTS_BY_NAME.get(name)
+
+
+def agent_switch_prefix(name: str) -> str:
+    """Return the ``/agent <name>`` line that selects *name* in a session."""
+    prefix = _AGENT_SWITCH_PREFIX.get(name)
+    if prefix is None:
+        prefix = f"/agent {name}\n"
+    return prefix
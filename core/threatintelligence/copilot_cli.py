@@ -4,22 +4,34 @@ from __future__ import annotations
 
 import argparse
 import asyncio
-import json
 import os
+import signal
 import sys
+import threading
 from pathlib import Path
+from typing import Any
+
+import orjson
 
 if __package__ in (None, ""):
     # Allow direct execution: python3 core/threatintelligence/copilot_cli.py
     sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+    from core.threatintelligence.copilot_agents import list_default_agents  # type: ignore
     from core.threatintelligence.copilot_service import (  # type: ignore
         ThreatIntelCopilotService,
         build_agent_switch_prompt,
     )
 else:
+    from .copilot_agents import list_default_agents
     from .copilot_service import ThreatIntelCopilotService, build_agent_switch_prompt
 
 
+def _dumps(obj: Any) -> str:
+    # SDK types are dataclasses that orjson would serialize field-by-field;
+    # callers pass their to_dict() output to keep the SDK's wire keys.
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+
 def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="Threat intelligence Copilot SDK CLI")
     parser.add_argument("--model", default=None, help="Optional model ID to use")
@@ -50,21 +62,121 @@ def _build_parser() -> argparse.ArgumentParser:
         help="Print what would be sent without calling Copilot",
     )
 
+    all_parser = subparsers.add_parser(
+        "analyze-all",
+        help="Run tool analyst agents concurrently, one prompt file per agent",
+    )
+    all_parser.add_argument(
+        "--input",
+        action="append",
+        required=True,
+        metavar="AGENT=FILE",
+        help="Tool agent name and the file holding its prompt (repeatable)",
+    )
+    all_parser.add_argument("--timeout", type=float, default=120.0, help="Per-agent wait timeout in seconds")
+
     return parser
 
 
-async def _run_async(args: argparse.Namespace) -> int:
-    service = ThreatIntelCopilotService(
-        model=args.model,
-        working_directory=str(Path.cwd()),
-        github_token=args.github_token,
-    )
+class _StdinLines:
+    """Reads REPL input lines without blocking the event loop.
+
+    Each read runs on a daemon thread calling ``os.read`` on fd 0. A thread
+    from ``asyncio.to_thread`` is joined on shutdown, so Ctrl-C at the prompt
+    would hang until Enter. ``input()`` holds ``sys.stdin``'s buffer lock,
+    which a daemon thread must not own while the interpreter exits.
+    """
+
+    def __init__(self) -> None:
+        self._pending = b""
+
+    def _read_line(self) -> str:
+        while b"\n" not in self._pending:
+            chunk = os.read(0, 4096)
+            if not chunk:
+                if not self._pending:
+                    raise EOFError
+                line, self._pending = self._pending, b""
+                return line.decode(errors="replace")
+            self._pending += chunk
+        line, _, self._pending = self._pending.partition(b"\n")
+        return line.decode(errors="replace")
+
+    def readline(self, prompt: str) -> asyncio.Future[str]:
+        print(prompt, end="", flush=True)
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[str] = loop.create_future()
+
+        def _settle(value: str | None, exc: BaseException | None) -> None:
+            if future.done():
+                return
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(value)
+
+        def _worker() -> None:
+            try:
+                line = self._read_line()
+            except BaseException as exc:  # pylint: disable=broad-except
+                loop.call_soon_threadsafe(_settle, None, exc)
+            else:
+                loop.call_soon_threadsafe(_settle, line, None)
+
+        threading.Thread(target=_worker, name="repl-input", daemon=True).start()
+        return future
 
-    if args.command == "auth-status":
-        status = await service.get_auth_status()
-        print(json.dumps(status.to_dict(), indent=2))
-        return 0
 
+async def _stream_reply(service: ThreatIntelCopilotService, args: argparse.Namespace, prompt: str) -> None:
+    async for chunk in service.chat_stream(
+        agent_name=args.agent, prompt=prompt, timeout=args.timeout
+    ):
+        print(chunk, end="", flush=True)
+    print()
+
+
+async def _run_repl(service: ThreatIntelCopilotService, args: argparse.Namespace) -> int:
+    print(f"Interactive mode started for agent '{args.agent}'. Type 'exit' to quit.")
+    loop = asyncio.get_running_loop()
+    stdin = _StdinLines()
+    # One client and one session for the whole REPL; both are torn down when
+    # the block exits.
+    async with service:
+        session = await service.open_session(args.agent)
+        while True:
+            try:
+                user_prompt = (await stdin.readline("> ")).strip()
+            except EOFError:
+                print()
+                return 0
+            if not user_prompt:
+                continue
+            if user_prompt.lower() in {"exit", "quit"}:
+                return 0
+
+            # While a reply streams, Ctrl-C cancels just that reply and the
+            # REPL carries on; at the prompt it still exits as before.
+            reply = asyncio.ensure_future(_stream_reply(service, args, user_prompt))
+            previous_handler = signal.getsignal(signal.SIGINT)
+            loop.add_signal_handler(signal.SIGINT, reply.cancel)
+            try:
+                await asyncio.wait({reply})
+            finally:
+                loop.remove_signal_handler(signal.SIGINT)
+                signal.signal(signal.SIGINT, previous_handler)
+
+            if reply.cancelled():
+                print("\n[cancelled]")
+                try:
+                    await session.abort()
+                except Exception:  # pylint: disable=broad-except
+                    pass
+            else:
+                reply.result()
+
+
+async def _run_async(args: argparse.Namespace) -> int:
+    # Answered from the local catalog; no service or SDK needed.
     if args.command == "list-agents":
         payload = [
             {
@@ -72,14 +184,25 @@ async def _run_async(args: argparse.Namespace) -> int:
                 "display_name": agent.display_name,
                 "description": agent.description,
             }
-            for agent in service.list_agents()
+            for agent in list_default_agents()
         ]
-        print(json.dumps(payload, indent=2))
+        print(_dumps(payload))
+        return 0
+
+    service = ThreatIntelCopilotService(
+        model=args.model,
+        working_directory=str(Path.cwd()),
+        github_token=args.github_token,
+    )
+
+    if args.command == "auth-status":
+        status = await service.get_auth_status()
+        print(_dumps(status.to_dict()))
         return 0
 
     if args.command == "list-models":
         models = await service.list_models()
-        print(json.dumps([model.to_dict() for model in models], indent=2))
+        print(_dumps([model.to_dict() for model in models]))
         return 0
 
     if args.command == "chat":
@@ -91,33 +214,37 @@ async def _run_async(args: argparse.Namespace) -> int:
                 "interactive": bool(args.interactive),
                 "timeout": args.timeout,
             }
-            print(json.dumps(preview, indent=2))
+            print(_dumps(preview))
             return 0
 
         if args.interactive:
-            print(f"Interactive mode started for agent '{args.agent}'. Type 'exit' to quit.")
-            while True:
-                user_prompt = input("> ").strip()
-                if not user_prompt:
-                    continue
-                if user_prompt.lower() in {"exit", "quit"}:
-                    return 0
-                result = await service.chat(agent_name=args.agent, prompt=user_prompt, timeout=args.timeout)
-                print(result["response"])
-            
+            return await _run_repl(service, args)
+
         if not args.prompt:
             raise ValueError("--prompt is required when --interactive is not set")
 
         result = await service.chat(agent_name=args.agent, prompt=args.prompt, timeout=args.timeout)
-        print(json.dumps(result, indent=2))
+        print(_dumps(result))
+        return 0
+
+    if args.command == "analyze-all":
+        tool_inputs: dict[str, str] = {}
+        for item in args.input:
+            agent_name, sep, path = item.partition("=")
+            if not sep or not path:
+                raise ValueError(f"--input expects AGENT=FILE, got '{item}'")
+            tool_inputs[agent_name] = Path(path).read_text(encoding="utf-8")
+
+        results = await service.analyze_all_tools(tool_inputs, timeout=args.timeout)
+        print(_dumps(results))
         return 0
 
     raise ValueError(f"Unsupported command: {args.command}")
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
     parser = _build_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
     try:
         return asyncio.run(_run_async(args))
     except KeyboardInterrupt:
@@ -7,16 +7,39 @@ latency predictable across all tool-analyst and summarizer agents.
 
 from __future__ import annotations
 
-from typing import Any
+import asyncio
+import contextlib
+import time
+from typing import TYPE_CHECKING, Any, AsyncIterator
 
-from copilot import CopilotClient, PermissionHandler
-from copilot.generated.session_events import SessionEvent, SessionEventType
+import orjson
 
-from .copilot_agents import ThreatIntelAgent, list_default_agents
+from .copilot_agents import (
+    DEFAULT_CUSTOM_AGENTS_CONFIG,
+    OUTPUT_KEYS_BY_AGENT,
+    TOOL_AGENTS,
+    ThreatIntelAgent,
+    agent_switch_prefix,
+    inconclusive_tool_reply,
+    list_default_agents,
+)
+
+if TYPE_CHECKING:
+    from copilot import CopilotClient, CopilotSession
+    from copilot.generated.session_events import SessionEvent
+
+# The SDK itself is imported on first use, so commands that never talk to
+# Copilot (``copilot_cli.py list-agents``) skip its import cost.
 
 # ─── Enforced model ──────────────────────────────────────────────────────
 REQUIRED_MODEL = "gpt-5-mini"
 
+# How long a positive auth check is trusted while a pooled client is open.
+AUTH_CACHE_TTL = 60.0
+
+# Leads the reply text of a turn that ended in a session error.
+SESSION_ERROR_PREFIX = "[session.error] "
+
 
 class ThreatIntelCopilotService:
     """Wrapper around ``github-copilot-sdk`` for local threat-intel usage.
@@ -38,88 +61,170 @@ class ThreatIntelCopilotService:
         self.working_directory = working_directory
         self.github_token = github_token
         self._agents = list_default_agents()
+        self._custom_agents = list(DEFAULT_CUSTOM_AGENTS_CONFIG)
+        self._agents_by_name = {agent.name: agent for agent in self._agents}
+        self._supported_agents = ", ".join(self._agents_by_name)
+        self._client: CopilotClient | None = None
+        self._auth_cache: tuple[float, Any] | None = None
+        self._sessions: dict[str, CopilotSession] = {}
+        self._pool_users = 0
+        # Serializes pooled() entrants behind the client start in progress.
+        self._pool_lock = asyncio.Lock()
+        # Neither the client options nor the session config change after
+        # construction, and the SDK only reads them, so they're built once.
+        self._client_options: dict[str, Any] = {}
+        if working_directory:
+            self._client_options["cwd"] = working_directory
+        if github_token:
+            self._client_options["github_token"] = github_token
+        self._session_config_cache: dict[str, Any] | None = None
 
-    def list_agents(self) -> list[ThreatIntelAgent]:
-        """List locally configured agent profiles."""
-        return list(self._agents)
+    async def __aenter__(self) -> "ThreatIntelCopilotService":
+        """Start one long-lived client shared by every call until exit."""
+        if self._client is None:
+            client = self._new_client()
+            await client.start()
+            self._client = client
+        return self
 
-    async def get_auth_status(self) -> Any:
-        """Fetch Copilot authentication state from the SDK client."""
-        options: dict[str, Any] = {}
-        if self.working_directory:
-            options["cwd"] = self.working_directory
-        if self.github_token:
-            options["github_token"] = self.github_token
-        client = CopilotClient(options)
-        await client.start()
+    async def __aexit__(self, *exc_info: Any) -> None:
+        client, self._client = self._client, None
+        sessions, self._sessions = self._sessions, {}
+        self._auth_cache = None
         try:
-            return await client.get_auth_status()
+            for session in sessions.values():
+                await session.destroy()
         finally:
-            await client.stop()
+            if client is not None:
+                await client.stop()
 
-    async def list_models(self) -> list[Any]:
-        """List models exposed by the authenticated Copilot runtime."""
-        options: dict[str, Any] = {}
-        if self.working_directory:
-            options["cwd"] = self.working_directory
-        if self.github_token:
-            options["github_token"] = self.github_token
-        client = CopilotClient(options)
+    def _new_client(self) -> CopilotClient:
+        from copilot import CopilotClient
+
+        return CopilotClient(self._client_options)
+
+    @contextlib.asynccontextmanager
+    async def _client_scope(self) -> AsyncIterator[CopilotClient]:
+        """Yield the pooled client, or a transient one stopped on exit."""
+        if self._client is not None:
+            yield self._client
+            return
+        client = self._new_client()
         await client.start()
         try:
-            return await client.list_models()
+            yield client
         finally:
             await client.stop()
 
-    async def chat(self, *, agent_name: str, prompt: str, timeout: float = 120.0) -> dict[str, Any]:
-        """Send a prompt via Copilot to the selected agent and return the response."""
-        if not prompt.strip():
-            raise ValueError("Prompt must not be empty.")
+    @contextlib.asynccontextmanager
+    async def pooled(self) -> AsyncIterator["ThreatIntelCopilotService"]:
+        """Share one client across every call made inside the block.
+
+        Unlike ``async with service`` this may be nested or entered by
+        concurrent tasks: the first block starts the client and the last one
+        to exit stops it.  A client already pooled by ``async with`` is left
+        running.
+        """
+        if self._client is not None and self._pool_users == 0:
+            yield self
+            return
+        self._pool_users += 1
+        try:
+            # Later entrants wait here for the first one's start to finish,
+            # rather than running against a client that isn't up yet.
+            async with self._pool_lock:
+                if self._client is None:
+                    await self.__aenter__()
+            yield self
+        finally:
+            self._pool_users -= 1
+            if self._pool_users == 0:
+                await self.__aexit__(None, None, None)
+
+    async def _auth_status(self, client: CopilotClient) -> Any:
+        """Return the auth state, reusing a recent positive check when pooled."""
+        cached = self._auth_cache
+        if cached is not None and time.monotonic() - cached[0] < AUTH_CACHE_TTL:
+            return cached[1]
+        status = await client.get_auth_status()
+        if client is self._client and status.isAuthenticated:
+            self._auth_cache = (time.monotonic(), status)
+        return status
 
-        agent = next((item for item in self._agents if item.name == agent_name), None)
+    def list_agents(self) -> tuple[ThreatIntelAgent, ...]:
+        """List locally configured agent profiles."""
+        return self._agents
+
+    async def get_auth_status(self) -> Any:
+        """Fetch Copilot authentication state from the SDK client."""
+        async with self._client_scope() as client:
+            return await client.get_auth_status()
+
+    async def list_models(self) -> list[Any]:
+        """List models exposed by the authenticated Copilot runtime."""
+        async with self._client_scope() as client:
+            return await client.list_models()
+
+    def _resolve_agent(self, agent_name: str) -> ThreatIntelAgent:
+        agent = self._agents_by_name.get(agent_name)
         if agent is None:
-            supported = ", ".join(a.name for a in self._agents)
-            raise ValueError(f"Unknown agent '{agent_name}'. Supported agents: {supported}")
+            raise ValueError(
+                f"Unknown agent '{agent_name}'. Supported agents: {self._supported_agents}"
+            )
+        return agent
 
-        options: dict[str, Any] = {}
-        if self.working_directory:
-            options["cwd"] = self.working_directory
+    def _session_config(self) -> dict[str, Any]:
+        # Built on first use rather than in __init__ to keep the SDK import lazy.
+        if self._session_config_cache is None:
+            from copilot import PermissionHandler
+
+            session_config: dict[str, Any] = {
+                "on_permission_request": PermissionHandler.approve_all,
+                "custom_agents": self._custom_agents,
+                "streaming": True,
+            }
+            if self.model:
+                session_config["model"] = self.model
+            if self.working_directory:
+                session_config["working_directory"] = self.working_directory
+            self._session_config_cache = session_config
+        return self._session_config_cache
+
+    async def _require_auth(self, client: CopilotClient) -> None:
+        # An explicit token is accepted as-is, so the round-trip is skipped.
         if self.github_token:
-            options["github_token"] = self.github_token
+            return
+        auth_status = await self._auth_status(client)
+        if not auth_status.isAuthenticated:
+            message = auth_status.statusMessage or "Copilot is not authenticated."
+            raise RuntimeError(
+                "Copilot authentication required. "
+                "Run `python3 core/threatintelligence/copilot_cli.py auth-status` and sign in first. "
+                f"Status: {message}"
+            )
 
-        custom_agents = [entry.to_custom_agent_config() for entry in self._agents]
-        session_config: dict[str, Any] = {
-            "on_permission_request": PermissionHandler.approve_all,
-            "custom_agents": custom_agents,
-            "streaming": True,
-        }
-        if self.model:
-            session_config["model"] = self.model
-        if self.working_directory:
-            session_config["working_directory"] = self.working_directory
+    async def chat(
+        self,
+        *,
+        agent_name: str,
+        prompt: str,
+        timeout: float = 120.0,
+    ) -> dict[str, Any]:
+        """Send a prompt via Copilot to the selected agent and return the response."""
+        if not prompt.strip():
+            raise ValueError("Prompt must not be empty.")
 
+        agent = self._resolve_agent(agent_name)
         command_prompt = build_agent_switch_prompt(agent.name, prompt)
 
-        client = CopilotClient(options)
-        await client.start()
-        try:
-            auth_status = await client.get_auth_status()
-            if not auth_status.isAuthenticated and not self.github_token:
-                message = auth_status.statusMessage or "Copilot is not authenticated."
-                raise RuntimeError(
-                    "Copilot authentication required. "
-                    "Run `python3 core/threatintelligence/copilot_cli.py auth-status` and sign in first. "
-                    f"Status: {message}"
-                )
-
-            session = await client.create_session(session_config)
+        async with self._client_scope() as client:
+            await self._require_auth(client)
+            session = await client.create_session(self._session_config())
             try:
                 final_event = await session.send_and_wait({"prompt": command_prompt}, timeout=timeout)
                 history = await session.get_messages()
             finally:
                 await session.destroy()
-        finally:
-            await client.stop()
 
         response_text = _extract_assistant_text(final_event, history)
         return {
@@ -130,23 +235,193 @@ class ThreatIntelCopilotService:
             "event_count": len(history),
         }
 
+    async def analyze_all_tools(
+        self, tool_inputs: dict[str, str], *, timeout: float = 120.0
+    ) -> dict[str, dict[str, Any]]:
+        """Run the tool analysts for *tool_inputs* concurrently.
+
+        *tool_inputs* maps a tool agent name to its prompt; tool agents
+        without an entry are skipped.  Results come back keyed by agent name in
+        ``TOOL_AGENTS`` order.  A failed agent gets an ``inconclusive`` stub
+        in ``response`` and the reason in ``error`` so a summarizer still
+        sees every tool.  All calls share one client.
+        """
+        agents = [agent for agent in TOOL_AGENTS if agent.name in tool_inputs]
+        if len(agents) != len(tool_inputs):
+            unknown = ", ".join(sorted(set(tool_inputs) - {agent.name for agent in agents}))
+            raise ValueError(f"Not tool analyst agents: {unknown}")
+        # pooled() shares the client through the refcount, so a concurrent
+        # pooled() block is neither given a second client nor has it stopped.
+        async with self.pooled():
+            results = await self._gather_tools(agents, tool_inputs, timeout)
+
+        analyses: dict[str, dict[str, Any]] = {}
+        for agent, result in zip(agents, results):
+            if isinstance(result, Exception):
+                result = _inconclusive_result(agent, tool_inputs[agent.name], result)
+            analyses[agent.name] = result
+        return analyses
+
+    async def _gather_tools(
+        self,
+        agents: list[ThreatIntelAgent],
+        tool_inputs: dict[str, str],
+        timeout: float,
+    ) -> list[Any]:
+        return await asyncio.gather(
+            *(
+                self.chat(agent_name=agent.name, prompt=tool_inputs[agent.name], timeout=timeout)
+                for agent in agents
+            ),
+            return_exceptions=True,
+        )
+
+    async def open_session(self, agent_name: str) -> CopilotSession:
+        """Open, or reuse, a long-lived session for *agent_name*.
+
+        Only available inside ``async with service:``. The session stays
+        alive until the service exits so repeat prompts keep the server's
+        cached system-prompt prefix instead of paying for it every turn.
+        """
+        if self._client is None:
+            raise RuntimeError("open_session() requires `async with service:`")
+        agent = self._resolve_agent(agent_name)
+        session = self._sessions.get(agent.name)
+        if session is None:
+            await self._require_auth(self._client)
+            session = await self._client.create_session(self._session_config())
+            self._sessions[agent.name] = session
+        return session
+
+    async def send_stream(
+        self,
+        session: CopilotSession,
+        *,
+        agent_name: str,
+        prompt: str,
+        timeout: float = 120.0,
+    ) -> AsyncIterator[str]:
+        """Send *prompt* on an open session and yield the reply as it streams in.
+
+        *timeout* bounds the wait for each next event rather than the whole
+        reply, so a long answer that keeps streaming is not cut off.
+        """
+        if not prompt.strip():
+            raise ValueError("Prompt must not be empty.")
+        from copilot.generated.session_events import SessionEventType
+
+        events: asyncio.Queue[SessionEvent] = asyncio.Queue()
+        unsubscribe = session.on(events.put_nowait)
+        try:
+            await session.send({"prompt": build_agent_switch_prompt(agent_name, prompt)})
+            streamed = False
+            while True:
+                try:
+                    event = await asyncio.wait_for(events.get(), timeout)
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"No session events for {timeout}s") from None
+                event_type = event.type
+                if event_type == SessionEventType.ASSISTANT_MESSAGE_DELTA:
+                    delta = getattr(event.data, "delta_content", None)
+                    if delta:
+                        streamed = True
+                        yield delta
+                elif event_type == SessionEventType.ASSISTANT_MESSAGE:
+                    # Without deltas (streaming off) the full message is all we get.
+                    content = getattr(event.data, "content", None)
+                    if content and not streamed:
+                        yield str(content)
+                    streamed = False
+                elif event_type == SessionEventType.SESSION_IDLE:
+                    return
+                elif event_type == SessionEventType.SESSION_ERROR:
+                    raise RuntimeError(
+                        f"Session error: {getattr(event.data, 'message', None) or event.data}"
+                    )
+        finally:
+            unsubscribe()
+
+    async def chat_stream(
+        self, *, agent_name: str, prompt: str, timeout: float = 120.0
+    ) -> AsyncIterator[str]:
+        """Stream a reply from *agent_name*, reusing its open session if pooled."""
+        if self._client is not None:
+            session = await self.open_session(agent_name)
+            async for chunk in self.send_stream(
+                session, agent_name=agent_name, prompt=prompt, timeout=timeout
+            ):
+                yield chunk
+            return
+
+        agent = self._resolve_agent(agent_name)
+        async with self._client_scope() as client:
+            await self._require_auth(client)
+            session = await client.create_session(self._session_config())
+            try:
+                async for chunk in self.send_stream(
+                    session, agent_name=agent.name, prompt=prompt, timeout=timeout
+                ):
+                    yield chunk
+            finally:
+                await session.destroy()
+
+
+def validate_agent_reply(agent_name: str, text: str) -> tuple[Any, str | None]:
+    """Parse *text* and check it carries the agent's required top-level keys.
+
+    Returns ``(parsed, error)``; *parsed* is ``None`` when *text* is not JSON.
+    ThreatAnalyzer uses it to decide which replies are fit to cache.
+    """
+    try:
+        parsed = orjson.loads(text)
+    except orjson.JSONDecodeError as exc:
+        return None, f"Reply is not valid JSON: {exc}"
+    if not isinstance(parsed, dict):
+        return parsed, "Reply is not a JSON object"
+    missing = OUTPUT_KEYS_BY_AGENT.get(agent_name, frozenset()) - parsed.keys()
+    if missing:
+        return parsed, f"Reply is missing keys: {', '.join(sorted(missing))}"
+    return parsed, None
+
+
+def _inconclusive_result(agent: ThreatIntelAgent, prompt: str, exc: BaseException) -> dict[str, Any]:
+    """Stand-in for a failed tool analyst, shaped like a ``chat`` result."""
+    return {
+        "agent": agent.name,
+        "agent_display_name": agent.display_name,
+        "prompt": prompt,
+        "response": inconclusive_tool_reply(
+            agent.name.removesuffix("-analyzer"), f"Agent error: {exc}"
+        ),
+        "event_count": 0,
+        "error": str(exc),
+    }
+
 
 def _extract_assistant_text(final_event: SessionEvent | None, history: list[SessionEvent]) -> str:
     """Extract assistant response text from final event, with history fallback."""
+    from copilot.generated.session_events import SessionEventType
+
     if final_event and getattr(final_event.data, "content", None):
         return str(final_event.data.content)
 
+    # One reverse pass: the newest assistant message wins outright, and the
+    # newest session error is remembered in case there is none.
+    error_message = None
     for event in reversed(history):
-        if event.type == SessionEventType.ASSISTANT_MESSAGE and getattr(event.data, "content", None):
-            return str(event.data.content)
-
-    for event in reversed(history):
-        if event.type == SessionEventType.SESSION_ERROR and getattr(event.data, "message", None):
-            return f"[session.error] {event.data.message}"
+        event_type = event.type
+        if event_type == SessionEventType.ASSISTANT_MESSAGE:
+            content = getattr(event.data, "content", None)
+            if content:
+                return str(content)
+        elif error_message is None and event_type == SessionEventType.SESSION_ERROR:
+            error_message = getattr(event.data, "message", None)
 
+    if error_message:
+        return f"{SESSION_ERROR_PREFIX}{error_message}"
     return ""
 
 
 def build_agent_switch_prompt(agent_name: str, prompt: str) -> str:
     """Build the slash command prompt used to select an agent and send content."""
-    return f"/agent {agent_name}\n{prompt}"
+    return agent_switch_prefix(agent_name) + prompt
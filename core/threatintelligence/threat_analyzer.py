@@ -25,15 +25,22 @@ Results are saved to ``report_dir/ai_analysis/``.
 from __future__ import annotations
 
 import asyncio
+import contextlib
 import csv
 import datetime
-import json
+import functools
+import hashlib
+import itertools
 import logging
 import os
+import re
+import time
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 
+import orjson
+
 log = logging.getLogger("isolens.threat_analyzer")
 
 # ─── Default paths ────────────────────────────────────────────────────────
@@ -44,6 +51,19 @@ DEFAULT_REPORTS_DIR = _PROJECT_ROOT / "core" / "storage" / "reports"
 # Maximum characters of raw data to send per tool (keeps tokens in check)
 MAX_TOOL_PAYLOAD_CHARS = 6000
 
+# Per-tool overrides of that budget: the IOC-dense event logs get more room,
+# the small or low-signal ones less, for about the same total
+TOOL_PAYLOAD_CHARS: Dict[str, int] = {
+    "sysmon": 8000,
+    "procmon": 8000,
+    "network": 10000,
+    "handle": 3000,
+    "metadata": 1500,
+}
+
+# How long a cached agent reply stays valid (seconds); 0 disables the cache
+RESPONSE_CACHE_TTL = 7 * 24 * 3600
+
 
 # ─── Data classes ─────────────────────────────────────────────────────────
 
@@ -51,9 +71,10 @@ MAX_TOOL_PAYLOAD_CHARS = 6000
 class ToolAnalysisResult:
     """Result from a single tool-specific agent."""
 
+    # Field order matches ``to_dict`` so orjson can serialize the dataclass
+    # itself to the same JSON.
     tool: str
     agent_name: str
-    raw_response: str = ""
     verdict: str = "inconclusive"
     confidence: int = 0
     findings_count: int = 0
@@ -61,7 +82,18 @@ class ToolAnalysisResult:
     summary: str = ""
     findings: List[Dict[str, str]] = field(default_factory=list)
     iocs: List[Dict[str, str]] = field(default_factory=list)
+    raw_response: str = ""
     error: Optional[str] = None
+    # Decoded agent JSON, kept so the summarizer prompt reuses it instead of
+    # the raw text.  Not persisted (orjson skips "_" fields); ``raw_response``
+    # already is.
+    _parsed: Optional[Dict[str, Any]] = field(default=None, repr=False)
+
+    def summary_input(self) -> str:
+        """This result as compact JSON for the summarizer prompt."""
+        if self._parsed is not None:
+            return orjson.dumps(self._parsed, default=str).decode()
+        return self.raw_response
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -106,6 +138,12 @@ class ThreatAnalysisReport:
     raw_summary: str = ""
 
     def to_dict(self) -> Dict[str, Any]:
+        data = self._serializable()
+        data["tool_results"] = [r.to_dict() for r in self.tool_results]
+        return data
+
+    def _serializable(self) -> Dict[str, Any]:
+        """``to_dict`` with the tool results left as dataclasses for orjson."""
         return {
             "analysis_id": self.analysis_id,
             "model": self.model,
@@ -127,53 +165,53 @@ class ThreatAnalysisReport:
             "iocs": self.iocs,
             "mitre_attack": self.mitre_attack,
             "recommendations": self.recommendations,
-            "tool_results": [r.to_dict() for r in self.tool_results],
+            "tool_results": self.tool_results,
             "raw_summary": self.raw_summary,
         }
 
 
+def _utc_now_iso() -> str:
+    """Current UTC time as ISO 8601 with a ``Z`` suffix."""
+    return datetime.datetime.now(datetime.UTC).isoformat().replace("+00:00", "Z")
+
+
 # ─── Helper: read collector data ─────────────────────────────────────────
 
+# Readers open the file directly and treat any failure (missing, a directory,
+# unreadable, malformed) as no data, so there is no separate stat() first.
+
+
 def _read_json(path: str) -> Optional[dict]:
-    if os.path.isfile(path):
-        try:
-            with open(path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception:
-            return None
-    return None
+    try:
+        with open(path, "rb") as f:
+            return orjson.loads(f.read())
+    except Exception:
+        return None
 
 
 def _read_text(path: str, max_chars: int = MAX_TOOL_PAYLOAD_CHARS) -> Optional[str]:
-    if os.path.isfile(path):
-        try:
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                return f.read(max_chars)
-        except Exception:
-            return None
-    return None
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            return f.read(max_chars)
+    except Exception:
+        return None
 
 
 def _read_csv_as_text(path: str, max_rows: int = 200) -> Optional[str]:
-    if os.path.isfile(path):
-        try:
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                reader = csv.reader(f)
-                lines = []
-                for i, row in enumerate(reader):
-                    if i >= max_rows:
-                        lines.append(f"... truncated ({i}+ rows)")
-                        break
-                    lines.append(",".join(row))
-                return "\n".join(lines)
-        except Exception:
-            return None
-    return None
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            reader = csv.reader(f)
+            lines = list(map(",".join, itertools.islice(reader, max_rows)))
+            if next(reader, None) is not None:
+                lines.append(f"... truncated ({max_rows}+ rows)")
+            return "\n".join(lines)
+    except Exception:
+        return None
 
 
 def _truncate_json(data: Any, max_chars: int = MAX_TOOL_PAYLOAD_CHARS) -> str:
     """Serialize JSON data and truncate to stay within token budget."""
-    raw = json.dumps(data, indent=None, default=str)
+    raw = orjson.dumps(data, default=str).decode()
     if len(raw) > max_chars:
         return raw[:max_chars] + "\n... [truncated]"
     return raw
@@ -183,6 +221,13 @@ def _truncate_json(data: Any, max_chars: int = MAX_TOOL_PAYLOAD_CHARS) -> str:
 
 def _clean_json_response(raw: str) -> str:
     """Strip markdown fences and whitespace around the JSON response."""
+    # First "{" through last "}" — the JSON object, minus any fences or prose.
+    # Same span a greedy r"\{.*\}" would match, without its quadratic
+    # backtracking on replies that have many "{" and no closing "}".
+    start = raw.find("{")
+    end = raw.rfind("}")
+    if start != -1 and end > start:
+        return raw[start:end + 1]
     text = raw.strip()
     # Remove ```json ... ``` wrappers some models add despite instructions
     if text.startswith("```"):
@@ -192,59 +237,96 @@ def _clean_json_response(raw: str) -> str:
         if text.endswith("```"):
             text = text[:-3]
         text = text.strip()
-    # Try to extract JSON object if there's prose around it
-    brace_start = text.find("{")
-    brace_end = text.rfind("}")
-    if brace_start >= 0 and brace_end > brace_start:
-        text = text[brace_start:brace_end + 1]
     return text
 
 
+def _write_bytes(path: str, data: bytes) -> None:
+    with open(path, "wb") as f:
+        f.write(data)
+
+
 def _write_progress(report_dir: str, progress: Dict[str, Any]) -> None:
     """Write current AI analysis progress state to a JSON file."""
     ai_dir = os.path.join(report_dir, "ai_analysis")
     os.makedirs(ai_dir, exist_ok=True)
     progress_path = os.path.join(ai_dir, "progress.json")
     try:
-        with open(progress_path, "w", encoding="utf-8") as f:
-            json.dump(progress, f, indent=2)
+        with open(progress_path, "wb") as f:
+            f.write(orjson.dumps(progress, option=orjson.OPT_INDENT_2))
     except Exception as exc:
         log.warning("Failed to write AI progress for %s: %s", report_dir, exc)
 
 
-def _normalize_tool_findings(items: list) -> List[Dict]:
-    """Ensure per-tool findings are {severity, indicator, description}."""
+# Output shapes for the agent list normalizers.  Each field is
+# (key, default, fallback key, slice of a bare-string item or None for the
+# default) — dict items copy the key (or its fallback) as a string, bare
+# strings fill the sliced fields and default the rest.
+_WHOLE = slice(None)
+_TOOL_FINDING_FIELDS = (
+    ("severity", "medium", None, None),
+    ("indicator", "", None, slice(80)),
+    ("description", "", None, _WHOLE),
+)
+_TOOL_IOC_FIELDS = (
+    ("type", "unknown", None, None),
+    ("value", "", None, _WHOLE),
+)
+_FINDING_FIELDS = (
+    ("source", "", None, None),
+    ("severity", "medium", None, None),
+    ("description", "", "text", _WHOLE),
+)
+_IOC_FIELDS = (
+    ("type", "unknown", None, None),
+    ("severity", "medium", None, None),
+    ("value", "", None, _WHOLE),
+)
+_MITRE_FIELDS = (
+    ("id", "", "technique_id", None),
+    ("name", "", None, _WHOLE),
+    ("tactic", "", None, None),
+    ("description", "", None, None),
+)
+_RECOMMENDATION_FIELDS = (
+    ("priority", "medium", None, None),
+    ("action", "", "text", _WHOLE),
+)
+
+
+def _normalize(items: list, fields: tuple) -> List[Dict]:
+    """Coerce a list of agent dicts / bare strings into the *fields* shape."""
     out = []
     for item in items:
         if isinstance(item, dict):
+            get = item.get
             out.append({
-                "severity": str(item.get("severity", "medium")),
-                "indicator": str(item.get("indicator", "")),
-                "description": str(item.get("description", "")),
+                key: str(get(key, get(alt, default)) if alt else get(key, default))
+                for key, default, alt, _ in fields
             })
         elif isinstance(item, str):
-            out.append({"severity": "medium", "indicator": item[:80], "description": item})
-    return out
-
-
-def _normalize_tool_iocs(items: list) -> List[Dict]:
-    """Ensure per-tool IOCs are {type, value}."""
-    out = []
-    for item in items:
-        if isinstance(item, dict):
             out.append({
-                "type": str(item.get("type", "unknown")),
-                "value": str(item.get("value", "")),
+                key: default if part is None else item[part]
+                for key, default, _, part in fields
             })
-        elif isinstance(item, str):
-            out.append({"type": "unknown", "value": item})
     return out
 
 
-def _parse_tool_json(raw_json: str, result: ToolAnalysisResult) -> None:
-    """Parse a tool analysis JSON response into the result dataclass."""
+_normalize_tool_findings = functools.partial(_normalize, fields=_TOOL_FINDING_FIELDS)
+_normalize_tool_iocs = functools.partial(_normalize, fields=_TOOL_IOC_FIELDS)
+_normalize_findings = functools.partial(_normalize, fields=_FINDING_FIELDS)
+_normalize_iocs = functools.partial(_normalize, fields=_IOC_FIELDS)
+_normalize_mitre = functools.partial(_normalize, fields=_MITRE_FIELDS)
+_normalize_recommendations = functools.partial(_normalize, fields=_RECOMMENDATION_FIELDS)
+
+
+def _parse_tool_json(raw_json: str, result: ToolAnalysisResult) -> Optional[Dict[str, Any]]:
+    """Parse a tool analysis JSON response into the result dataclass.
+
+    Returns the decoded object (also kept on ``result._parsed``), or *None*
+    when the response was not JSON.
+    """
     try:
-        data = json.loads(raw_json)
+        data = orjson.loads(raw_json)
         result.verdict = str(data.get("verdict", "inconclusive")).strip().lower()
         try:
             result.confidence = int(data.get("confidence", 0))
@@ -259,7 +341,9 @@ def _parse_tool_json(raw_json: str, result: ToolAnalysisResult) -> None:
         if isinstance(iocs, list):
             result.iocs = _normalize_tool_iocs(iocs)
             result.iocs_count = len(result.iocs)
-    except json.JSONDecodeError as exc:
+        result._parsed = data
+        return data
+    except orjson.JSONDecodeError as exc:
         # Fallback: agent returned prose instead of JSON — wrap it
         log.warning("Failed to parse tool JSON for %s: %s", result.tool, exc)
         if raw_json.strip():
@@ -269,84 +353,40 @@ def _parse_tool_json(raw_json: str, result: ToolAnalysisResult) -> None:
             result.error = f"JSON parse error: {exc}"
         else:
             result.error = f"JSON parse error: {exc}"
+        return None
 
 
-def _infer_verdict_from_text(text: str) -> str:
-    """Best-effort verdict from plain text when JSON parsing fails."""
-    lower = text.lower()
-    if any(w in lower for w in ("malicious", "malware", "trojan", "ransomware", "backdoor")):
-        return "malicious"
-    if any(w in lower for w in ("suspicious", "anomal", "unusual", "concerning")):
-        return "suspicious"
-    if any(w in lower for w in ("benign", "clean", "legitimate", "safe")):
-        return "benign"
-    return "inconclusive"
-
-
-def _normalize_findings(items: list) -> List[Dict]:
-    """Ensure each finding is {source, severity, description}."""
-    out = []
-    for item in items:
-        if isinstance(item, dict):
-            out.append({
-                "source": str(item.get("source", "")),
-                "severity": str(item.get("severity", "medium")),
-                "description": str(item.get("description", item.get("text", ""))),
-            })
-        elif isinstance(item, str):
-            out.append({"source": "", "severity": "medium", "description": item})
-    return out
-
-
-def _normalize_iocs(items: list) -> List[Dict]:
-    """Ensure each IOC is {type, severity, value}."""
-    out = []
-    for item in items:
-        if isinstance(item, dict):
-            out.append({
-                "type": str(item.get("type", "unknown")),
-                "severity": str(item.get("severity", "medium")),
-                "value": str(item.get("value", "")),
-            })
-        elif isinstance(item, str):
-            out.append({"type": "unknown", "severity": "medium", "value": item})
-    return out
-
-
-def _normalize_mitre(items: list) -> List[Dict]:
-    """Ensure each MITRE technique is {id, name, tactic, description}."""
-    out = []
-    for item in items:
-        if isinstance(item, dict):
-            out.append({
-                "id": str(item.get("id", item.get("technique_id", ""))),
-                "name": str(item.get("name", "")),
-                "tactic": str(item.get("tactic", "")),
-                "description": str(item.get("description", "")),
-            })
-        elif isinstance(item, str):
-            out.append({"id": "", "name": item, "tactic": "", "description": ""})
-    return out
+# Verdict keywords, strongest verdict first.  The lookahead makes the scan
+# find overlapping hits, so one pass sees every keyword the old per-word
+# substring checks would have.
+_VERDICT_KEYWORDS = (
+    ("malicious", ("malicious", "malware", "trojan", "ransomware", "backdoor")),
+    ("suspicious", ("suspicious", "anomal", "unusual", "concerning")),
+    ("benign", ("benign", "clean", "legitimate", "safe")),
+)
+_VERDICT_RANK = {verdict: rank for rank, (verdict, _) in enumerate(_VERDICT_KEYWORDS)}
+_VERDICT_PATTERN = re.compile(
+    "(?=" + "|".join(
+        f"(?P<{verdict}>{'|'.join(words)})" for verdict, words in _VERDICT_KEYWORDS
+    ) + ")"
+)
 
 
-def _normalize_recommendations(items: list) -> List[Dict]:
-    """Ensure each recommendation is {priority, action}."""
-    out = []
-    for item in items:
-        if isinstance(item, dict):
-            out.append({
-                "priority": str(item.get("priority", "medium")),
-                "action": str(item.get("action", item.get("text", ""))),
-            })
-        elif isinstance(item, str):
-            out.append({"priority": "medium", "action": item})
-    return out
+def _infer_verdict_from_text(text: str) -> str:
+    """Best-effort verdict from plain text when JSON parsing fails."""
+    best = len(_VERDICT_KEYWORDS)
+    for match in _VERDICT_PATTERN.finditer(text.lower()):
+        rank = _VERDICT_RANK[match.lastgroup]
+        if rank == 0:
+            return _VERDICT_KEYWORDS[0][0]
+        best = min(best, rank)
+    return _VERDICT_KEYWORDS[best][0] if best < len(_VERDICT_KEYWORDS) else "inconclusive"
 
 
 def _parse_summary_json(raw_json: str, report: ThreatAnalysisReport) -> None:
     """Parse a threat_report JSON response into the report dataclass."""
     try:
-        data = json.loads(raw_json)
+        data = orjson.loads(raw_json)
         try:
             report.risk_score = int(data.get("risk_score", 0))
         except (ValueError, TypeError):
@@ -380,7 +420,7 @@ def _parse_summary_json(raw_json: str, report: ThreatAnalysisReport) -> None:
         recs = data.get("recommendations", [])
         report.recommendations = _normalize_recommendations(recs if isinstance(recs, list) else [])
 
-    except json.JSONDecodeError as exc:
+    except orjson.JSONDecodeError as exc:
         # Fallback: summarizer returned prose — use it as executive summary
         log.warning("Failed to parse summary JSON: %s", exc)
         if raw_json.strip():
@@ -402,7 +442,131 @@ def _parse_summary_json(raw_json: str, report: ThreatAnalysisReport) -> None:
             report.error = None  # mark as usable despite JSON failure
         else:
             report.error = f"Summary JSON parse error: {exc}"
-        log.warning("Failed to parse summary JSON: %s", exc)
+
+
+# ─── Helper: incremental summarizer prompt ────────────────────────────────
+
+_SUMMARY_REPLY_RULES = (
+    "IMPORTANT: Respond with ONLY a valid JSON object. "
+    "First character must be '{'. Last character must be '}'. "
+    "Use the exact keys from the schema: risk_score, threat_level, classification, "
+    "executive_summary, key_findings, iocs, mitre_attack, recommendations, detailed_analysis."
+)
+
+# Share of tool analyses that must be unchanged since the last summary for
+# the summarizer to revise that report instead of starting from scratch
+DELTA_SUMMARY_MIN_UNCHANGED = 0.8
+
+
+def _summary_blocks(tool_responses: Dict[str, str]) -> Dict[str, str]:
+    """SHA-256 of each tool's summarizer input, keyed by tool name."""
+    return {
+        tool: hashlib.sha256(text.encode("utf-8")).hexdigest()
+        for tool, text in tool_responses.items()
+    }
+
+
+def _summary_state_path(report_dir: str) -> str:
+    return os.path.join(report_dir, "ai_analysis", ".cache", "session.json")
+
+
+def _load_summary_state(report_dir: str) -> Optional[dict]:
+    return _read_json(_summary_state_path(report_dir))
+
+
+def _save_summary_state(report_dir: str, blocks: Dict[str, str], raw_summary: str) -> None:
+    """Remember this run's inputs and report, if the report is real JSON."""
+    try:
+        orjson.loads(raw_summary)
+    except orjson.JSONDecodeError:
+        return
+    path = _summary_state_path(report_dir)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(orjson.dumps({"blocks": blocks, "raw_summary": raw_summary}))
+    except Exception as exc:
+        log.warning("Failed to save summary state for %s: %s", report_dir, exc)
+
+
+def _delta_summary_prompt(
+    state: Optional[dict],
+    sample_name: str,
+    tool_responses: Dict[str, str],
+    blocks: Dict[str, str],
+) -> Optional[str]:
+    """Build a "revise the previous report" prompt, or *None* for a full run.
+
+    Only used when the same tools ran last time and at least
+    ``DELTA_SUMMARY_MIN_UNCHANGED`` of their analyses are byte-identical;
+    the summarizer then gets its previous report plus just the changed
+    analyses.  No change at all is left to the response cache.
+    """
+    if not state or not isinstance(state.get("blocks"), dict):
+        return None
+    previous_summary = state.get("raw_summary")
+    previous_blocks = state["blocks"]
+    if not isinstance(previous_summary, str) or previous_blocks.keys() != blocks.keys():
+        return None
+    changed = [tool for tool, digest in blocks.items() if previous_blocks[tool] != digest]
+    if not changed or (len(blocks) - len(changed)) / len(blocks) < DELTA_SUMMARY_MIN_UNCHANGED:
+        return None
+
+    log.info("Summarizer revising previous report (changed: %s)", ", ".join(changed))
+    return "\n".join([
+        f"Sample: {sample_name}",
+        "",
+        "Below is the final threat report from a previous run, followed by the "
+        "tool analyses that have changed since. All other tool analyses are unchanged.",
+        "Revise the report to account for the changes and return the complete updated report.",
+        "",
+        "--- PREVIOUS THREAT REPORT ---",
+        previous_summary,
+        "",
+        *itertools.chain.from_iterable(
+            (f"--- UPDATED {tool.upper()} ANALYSIS ---", tool_responses[tool], "")
+            for tool in changed
+        ),
+        _SUMMARY_REPLY_RULES,
+    ])
+
+
+def _read_cached_response(path: str, ttl: float) -> Optional[str]:
+    try:
+        if time.time() - os.stat(path).st_mtime > ttl:
+            return None
+        with open(path, "rb") as f:
+            response = orjson.loads(f.read()).get("response")
+    except Exception:
+        return None
+    return response if isinstance(response, str) else None
+
+
+def _is_cacheable_reply(agent_name: str, response: str) -> bool:
+    """Whether *response* is a well-formed reply worth replaying from cache.
+
+    Session errors and replies that break the agent's JSON contract are
+    never stored, so one transient failure isn't served for the whole TTL.
+    """
+    from .copilot_service import SESSION_ERROR_PREFIX, validate_agent_reply
+
+    if not response.strip() or response.startswith(SESSION_ERROR_PREFIX):
+        return False
+    _, error = validate_agent_reply(agent_name, _clean_json_response(response))
+    return error is None
+
+
+def _write_cached_response(path: str, response: str) -> None:
+    # Written under a unique name and renamed so concurrent agents never
+    # see a partial entry.
+    tmp_path = f"{path}.{os.getpid()}.{id(response)}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps({"response": response}))
+        os.replace(tmp_path, path)
+    except Exception as exc:
+        log.warning("Failed to cache agent reply at %s: %s", path, exc)
 
 
 # ─── Collector → Agent mapping ────────────────────────────────────────────
@@ -412,25 +576,28 @@ def _load_sysmon(report_dir: str) -> tuple[str, bool]:
     data = _read_json(os.path.join(report_dir, "artifacts", "sysmon", "sysmon_summary.json"))
     if not data:
         return "No Sysmon data was collected for this analysis.", False
-    return _truncate_json(data), True
+    return _truncate_json(data, TOOL_PAYLOAD_CHARS["sysmon"]), True
 
 
 def _load_procmon(report_dir: str) -> tuple[str, bool]:
     data = _read_json(os.path.join(report_dir, "artifacts", "procmon", "procmon_summary.json"))
     if not data:
         return "No Procmon data was collected for this analysis.", False
-    return _truncate_json(data), True
+    return _truncate_json(data, TOOL_PAYLOAD_CHARS["procmon"]), True
 
 
 def _load_network(report_dir: str) -> tuple[str, bool]:
     data = _read_json(os.path.join(report_dir, "artifacts", "network", "network_summary.json"))
     if not data:
         return "No network capture data was collected for this analysis.", False
-    return _truncate_json(data), True
+    return _truncate_json(data, TOOL_PAYLOAD_CHARS["network"]), True
 
 
 def _load_handle(report_dir: str) -> tuple[str, bool]:
-    text = _read_text(os.path.join(report_dir, "artifacts", "handle", "handle_snapshot.txt"))
+    text = _read_text(
+        os.path.join(report_dir, "artifacts", "handle", "handle_snapshot.txt"),
+        TOOL_PAYLOAD_CHARS["handle"],
+    )
     if not text or not text.strip():
         return "No handle snapshot data was collected for this analysis.", False
     return text, True
@@ -461,7 +628,7 @@ def _load_metadata(report_dir: str) -> tuple[str, bool]:
         combined["metadata"] = data
     if not combined:
         return "No metadata available for this analysis.", False
-    return _truncate_json(combined), True
+    return _truncate_json(combined, TOOL_PAYLOAD_CHARS["metadata"]), True
 
 
 # Agent name → loader function
@@ -486,15 +653,26 @@ class ThreatAnalyzer:
         Root directory containing all analysis reports.
     copilot_service : ThreatIntelCopilotService | None
         Pre-configured Copilot service.  If *None*, one is created lazily.
+    cache_dir : str | None
+        Where agent replies are cached, keyed by a hash of the model, agent
+        and full prompt.  Defaults to ``ai_cache`` next to *reports_dir*.
+    cache_ttl : float
+        Seconds a cached reply is reused; ``0`` disables the cache.
     """
 
     def __init__(
         self,
         reports_dir: str | None = None,
         copilot_service: Any = None,
+        cache_dir: str | None = None,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
     ) -> None:
         self.reports_dir = reports_dir or str(DEFAULT_REPORTS_DIR)
         self._service = copilot_service
+        self.cache_dir = cache_dir or os.path.join(
+            os.path.dirname(os.path.abspath(self.reports_dir)), "ai_cache"
+        )
+        self.cache_ttl = cache_ttl
 
     def _get_service(self) -> Any:
         if self._service is None:
@@ -515,11 +693,23 @@ class ThreatAnalyzer:
         4. Feed them to the *threat-summarizer* agent.
         5. Parse the final JSON and save everything.
 
+        All agent calls of the run share one Copilot client.
+
         Returns the populated ``ThreatAnalysisReport``.
         """
+        service = self._get_service()
+        async with contextlib.AsyncExitStack() as stack:
+            if hasattr(service, "pooled"):
+                try:
+                    await stack.enter_async_context(service.pooled())
+                except Exception as exc:
+                    log.warning("Shared Copilot client unavailable, using one per call: %s", exc)
+            return await self._analyze_report(analysis_id, service)
+
+    async def _analyze_report(self, analysis_id: str, service: Any) -> ThreatAnalysisReport:
         report = ThreatAnalysisReport(
             analysis_id=analysis_id,
-            started_at=datetime.datetime.utcnow().isoformat() + "Z",
+            started_at=_utc_now_iso(),
         )
 
         report_dir = os.path.join(self.reports_dir, analysis_id)
@@ -528,7 +718,6 @@ class ThreatAnalyzer:
             report.error = f"Report directory not found: {analysis_id}"
             return report
 
-        service = self._get_service()
         report.model = service.model
         report.status = "running"
         
@@ -542,8 +731,9 @@ class ThreatAnalyzer:
 
         # ── Phase 1: Per-tool analysis (parallel) ─────────────────────
         tool_responses: Dict[str, str] = {}
+        sample_name = self._get_sample_name(report_dir)
 
-        from .copilot_agents import get_tool_agents
+        from .copilot_agents import get_tool_agents, inconclusive_tool_reply
 
         # Prepare all tasks — agents WITH data run in parallel
         async def _run_tool_agent(
@@ -554,7 +744,7 @@ class ThreatAnalyzer:
             )
             prompt = (
                 f"Analyze the following {tool_name} data from a malware sandbox execution.\n"
-                f"Sample file: {self._get_sample_name(report_dir)}\n\n"
+                f"Sample file: {sample_name}\n\n"
                 f"--- BEGIN {tool_name.upper()} DATA ---\n"
                 f"{payload_text}\n"
                 f"--- END {tool_name.upper()} DATA ---\n\n"
@@ -567,12 +757,9 @@ class ThreatAnalyzer:
                 progress_state["current_action"] = f"Agent {tool_name} analysing data..."
                 _write_progress(report_dir, progress_state)
                 
-                resp = await service.chat(
-                    agent_name=agent_def.name,
-                    prompt=prompt,
-                    timeout=120.0,
+                raw = _clean_json_response(
+                    await self._chat(service, agent_name=agent_def.name, prompt=prompt)
                 )
-                raw = _clean_json_response(resp.get("response", ""))
                 result.raw_response = raw
                 _parse_tool_json(raw, result)
                 log.info(
@@ -585,27 +772,24 @@ class ThreatAnalyzer:
                 _write_progress(report_dir, progress_state)
             except Exception as exc:
                 result.error = str(exc)
-                fallback = {
-                    "tool": tool_name,
-                    "verdict": "inconclusive",
-                    "confidence": 0,
-                    "findings": [],
-                    "iocs": [],
-                    "summary": f"Agent error: {exc}",
-                }
-                result.raw_response = json.dumps(fallback)
+                result.raw_response = inconclusive_tool_reply(tool_name, f"Agent error: {exc}")
                 log.error("Agent %s failed: %s", agent_def.name, exc)
             return result
 
         parallel_tasks = []
-        no_data_results: list[ToolAnalysisResult] = []
 
-        for agent_def in get_tool_agents():
-            loader = TOOL_LOADERS.get(agent_def.name)
-            if loader is None:
-                continue
+        # Collector files are read on worker threads, all at once, so the
+        # disk reads overlap instead of blocking the loop one after another.
+        loadable = [
+            (agent_def, TOOL_LOADERS[agent_def.name])
+            for agent_def in get_tool_agents()
+            if agent_def.name in TOOL_LOADERS
+        ]
+        loaded = await asyncio.gather(
+            *(asyncio.to_thread(loader, report_dir) for _, loader in loadable)
+        )
 
-            payload_text, has_data = loader(report_dir)
+        for (agent_def, _), (payload_text, has_data) in zip(loadable, loaded):
             tool_name = agent_def.name.replace("-analyzer", "")
 
             if not has_data:
@@ -614,17 +798,11 @@ class ThreatAnalyzer:
                 )
                 result.verdict = "inconclusive"
                 result.summary = f"No {tool_name} data was available for analysis."
-                fallback = {
-                    "tool": tool_name,
-                    "verdict": "inconclusive",
-                    "confidence": 0,
-                    "findings": [],
-                    "iocs": [],
-                    "summary": f"No data collected by {tool_name} collector.",
-                }
-                result.raw_response = json.dumps(fallback)
+                result.raw_response = inconclusive_tool_reply(
+                    tool_name, f"No data collected by {tool_name} collector."
+                )
                 tool_responses[tool_name] = result.raw_response
-                no_data_results.append(result)
+                report.tool_results.append(result)
                 log.info("Skipped %s (no data)", agent_def.name)
                 continue
 
@@ -636,69 +814,67 @@ class ThreatAnalyzer:
         # Run all agents WITH data in parallel
         if parallel_tasks:
             log.info("Running %d tool agents in parallel …", len(parallel_tasks))
-            coroutines = [
-                _run_tool_agent(ad, tn, pt) for ad, tn, pt in parallel_tasks
-            ]
-            parallel_results = await asyncio.gather(*coroutines, return_exceptions=True)
-            for i, res in enumerate(parallel_results):
+
+            async def _indexed(i: int, ad: Any, tn: str, pt: str) -> tuple:
+                try:
+                    return i, await _run_tool_agent(ad, tn, pt)
+                except Exception as exc:
+                    return i, exc
+
+            # Each result is post-processed as soon as its agent finishes, but
+            # kept in its slot so the summary prompt (and its cache key) and
+            # the report order don't depend on which agent answered first.
+            slots: list = [None] * len(parallel_tasks)
+            for next_done in asyncio.as_completed([
+                _indexed(i, ad, tn, pt) for i, (ad, tn, pt) in enumerate(parallel_tasks)
+            ]):
+                i, res = await next_done
                 if isinstance(res, Exception):
                     ad, tn, _ = parallel_tasks[i]
                     result = ToolAnalysisResult(
                         tool=tn, agent_name=ad.name,
                         error=str(res),
                     )
-                    fallback = {
-                        "tool": tn,
-                        "verdict": "inconclusive",
-                        "confidence": 0,
-                        "findings": [],
-                        "iocs": [],
-                        "summary": f"Agent error: {res}",
-                    }
-                    result.raw_response = json.dumps(fallback)
-                    tool_responses[tn] = result.raw_response
-                    report.tool_results.append(result)
+                    result.raw_response = inconclusive_tool_reply(tn, f"Agent error: {res}")
+                    slots[i] = (result, result.raw_response)
                 else:
-                    tool_responses[res.tool] = res.raw_response
-                    report.tool_results.append(res)
+                    slots[i] = (res, res.summary_input())
 
-        # Add no-data results
-        report.tool_results.extend(no_data_results)
+            # Analysed tools are listed ahead of the no-data ones
+            for i, (result, summary_input) in enumerate(slots):
+                tool_responses[result.tool] = summary_input
+                report.tool_results.insert(i, result)
 
         # ── Phase 2: Final summary ────────────────────────────────────
-        summary_input_parts = [
-            f"Sample: {self._get_sample_name(report_dir)}",
-            "",
-            "Below are the analysis outputs from each specialized tool analyst.",
-            "Synthesize them into a final threat report.",
-            "",
-        ]
-        for tool_name, json_text in tool_responses.items():
-            summary_input_parts.append(f"--- {tool_name.upper()} ANALYSIS ---")
-            summary_input_parts.append(json_text)
-            summary_input_parts.append("")
-
-        summary_input_parts.append(
-            "IMPORTANT: Respond with ONLY a valid JSON object. "
-            "First character must be '{'. Last character must be '}'. "
-            "Use the exact keys from the schema: risk_score, threat_level, classification, "
-            "executive_summary, key_findings, iocs, mitre_attack, recommendations, detailed_analysis."
+        summary_blocks = _summary_blocks(tool_responses)
+        summary_prompt = _delta_summary_prompt(
+            _load_summary_state(report_dir), sample_name, tool_responses, summary_blocks,
         )
-        summary_prompt = "\n".join(summary_input_parts)
+        if summary_prompt is None:
+            summary_prompt = "\n".join([
+                f"Sample: {sample_name}",
+                "",
+                "Below are the analysis outputs from each specialized tool analyst.",
+                "Synthesize them into a final threat report.",
+                "",
+                *itertools.chain.from_iterable(
+                    (f"--- {tool_name.upper()} ANALYSIS ---", json_text, "")
+                    for tool_name, json_text in tool_responses.items()
+                ),
+                _SUMMARY_REPLY_RULES,
+            ])
 
         try:
             log.info("Calling threat-summarizer agent …")
             progress_state["current_action"] = "Synthesizing final threat report..."
             _write_progress(report_dir, progress_state)
             
-            resp = await service.chat(
-                agent_name="threat-summarizer",
-                prompt=summary_prompt,
-                timeout=120.0,
+            raw_summary = _clean_json_response(
+                await self._chat(service, agent_name="threat-summarizer", prompt=summary_prompt)
             )
-            raw_summary = _clean_json_response(resp.get("response", ""))
             report.raw_summary = raw_summary
             _parse_summary_json(raw_summary, report)
+            _save_summary_state(report_dir, summary_blocks, raw_summary)
             log.info(
                 "Threat summary → risk=%d level=%s type=%s",
                 report.risk_score, report.threat_level, report.malware_type,
@@ -712,7 +888,7 @@ class ThreatAnalyzer:
             log.error("Threat summarizer failed: %s", exc)
 
         # ── Finalize ──────────────────────────────────────────────────
-        report.completed_at = datetime.datetime.utcnow().isoformat() + "Z"
+        report.completed_at = _utc_now_iso()
         report.status = "complete" if not report.error else "failed"
 
         progress_state["status"] = report.status
@@ -723,50 +899,71 @@ class ThreatAnalyzer:
         _write_progress(report_dir, progress_state)
 
         # Save results
-        self._save_results(report_dir, report)
+        await self._save_results(report_dir, report)
 
         return report
 
     def get_ai_report(self, analysis_id: str) -> Optional[Dict[str, Any]]:
         """Load a previously saved AI analysis report from disk."""
         report_dir = os.path.join(self.reports_dir, analysis_id)
-        ai_path = os.path.join(report_dir, "ai_analysis", "ai_report.json")
-        if os.path.isfile(ai_path):
-            try:
-                with open(ai_path, "r", encoding="utf-8") as f:
-                    return json.load(f)
-            except Exception:
-                return None
-        return None
+        return _read_json(os.path.join(report_dir, "ai_analysis", "ai_report.json"))
 
     # ── Internals ─────────────────────────────────────────────────────
 
+    async def _chat(self, service: Any, *, agent_name: str, prompt: str) -> str:
+        """Return the agent's reply to *prompt*, served from the cache if fresh.
+
+        A re-run over unchanged collector data sends byte-identical prompts,
+        so those replies come straight off disk with no LLM round-trip.
+        Only replies that meet the agent's JSON contract are stored, so a
+        failed turn is asked again next run instead of replayed from cache.
+        """
+        cache_path = None
+        if self.cache_ttl > 0:
+            from .copilot_agents import get_agent_by_name
+
+            agent = get_agent_by_name(agent_name)
+            key = "\0".join((service.model, agent_name, agent.prompt if agent else "", prompt))
+            digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+            cache_path = os.path.join(self.cache_dir, f"{digest}.json")
+            cached = _read_cached_response(cache_path, self.cache_ttl)
+            if cached is not None:
+                log.info("Agent %s reply served from cache", agent_name)
+                return cached
+
+        resp = await service.chat(agent_name=agent_name, prompt=prompt, timeout=120.0)
+        response = resp.get("response", "")
+        if cache_path and _is_cacheable_reply(agent_name, response):
+            _write_cached_response(cache_path, response)
+        return response
+
     def _get_sample_name(self, report_dir: str) -> str:
         manifest = _read_json(os.path.join(report_dir, "analysis_manifest.json"))
         if manifest:
             return manifest.get("sample_name", "unknown")
         return "unknown"
 
-    def _save_results(self, report_dir: str, report: ThreatAnalysisReport) -> None:
+    async def _save_results(self, report_dir: str, report: ThreatAnalysisReport) -> None:
         """Persist the AI analysis to the report directory."""
         ai_dir = os.path.join(report_dir, "ai_analysis")
         os.makedirs(ai_dir, exist_ok=True)
 
         # Full JSON report
-        report_path = os.path.join(ai_dir, "ai_report.json")
-        with open(report_path, "w", encoding="utf-8") as f:
-            json.dump(report.to_dict(), f, indent=2, default=str)
-
+        files = [(
+            "ai_report.json",
+            orjson.dumps(report._serializable(), default=str, option=orjson.OPT_INDENT_2),
+        )]
         # Individual tool JSON responses
         for result in report.tool_results:
-            tool_path = os.path.join(ai_dir, f"{result.tool}_analysis.json")
-            with open(tool_path, "w", encoding="utf-8") as f:
-                f.write(result.raw_response)
-
+            files.append((f"{result.tool}_analysis.json", result.raw_response.encode("utf-8")))
         # Summary JSON
         if report.raw_summary:
-            summary_path = os.path.join(ai_dir, "threat_report.json")
-            with open(summary_path, "w", encoding="utf-8") as f:
-                f.write(report.raw_summary)
+            files.append(("threat_report.json", report.raw_summary.encode("utf-8")))
+
+        # The files are independent, so write them side by side off the loop
+        await asyncio.gather(*(
+            asyncio.to_thread(_write_bytes, os.path.join(ai_dir, name), data)
+            for name, data in files
+        ))
 
         log.info("AI analysis saved to %s", ai_dir)
@@ -92,7 +92,7 @@ fi
 ok "Python venv found"
 
 # Python dependencies
-if ! "${VENV_PYTHON}" -c "import fastapi, uvicorn, httpx" 2>/dev/null; then
+if ! "${VENV_PYTHON}" -c "import fastapi, uvicorn, httpx, orjson, uvloop, httptools" 2>/dev/null; then
     warn "Missing Python packages — installing..."
     "${VENV_PYTHON}" -m pip install -q -r "${PROJECT_ROOT}/requirements.txt"
     ok "Python dependencies installed"
@@ -138,6 +138,8 @@ cd "${PROJECT_ROOT}"
 "${VENV_PYTHON}" -m uvicorn core.gateway.app:app \
     --host 0.0.0.0 \
     --port "${GATEWAY_PORT}" \
+    --loop uvloop \
+    --http httptools \
     --log-level info \
     &>"${PROJECT_ROOT}/gateway.log" &
 PIDS+=($!)
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""Run the tests/TEST_*.py scripts in parallel and report the results.
+
+Every test is a standalone script, so each one runs in its own interpreter;
+the runner only overlaps them.  Tests that touch shared host resources run
+one at a time after the parallel batch.  Output is printed per test in name
+order, followed by a pass/fail summary.
+
+    python scripts/run_tests.py            # all tests, one job per CPU
+    python scripts/run_tests.py -j 4 07 18 # only TEST_07* and TEST_18*
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TESTS_DIR = os.path.join(ROOT, "tests")
+
+# Tests that shell out to VirtualBox.  TEST_07's agent server binds an
+# ephemeral port, so it is safe to run alongside the rest.
+SERIAL_TESTS = {"TEST_09_vm_ip"}
+
+TEST_TIMEOUT = 300
+
+
+def discover(filters):
+    names = sorted(
+        name[:-3] for name in os.listdir(TESTS_DIR)
+        if name.startswith("TEST_") and name.endswith(".py")
+    )
+    if filters:
+        names = [n for n in names if any(n.startswith("TEST_" + f) for f in filters)]
+    return names
+
+
+def run_one(name):
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(
+            [sys.executable, os.path.join(TESTS_DIR, name + ".py")],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            timeout=TEST_TIMEOUT,
+            check=False,
+        )
+        rc, output = proc.returncode, proc.stdout
+    except subprocess.TimeoutExpired as exc:
+        rc, output = -1, (exc.stdout or b"") + b"\n(timed out)\n"
+    return name, rc, output.decode(errors="replace"), time.monotonic() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                        help="parallel test processes (default: CPU count)")
+    parser.add_argument("filters", nargs="*",
+                        help="run only tests whose number/name starts with these")
+    args = parser.parse_args(argv)
+
+    names = discover(args.filters)
+    parallel = [n for n in names if n not in SERIAL_TESTS]
+    serial = [n for n in names if n in SERIAL_TESTS]
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max(1, args.jobs)) as pool:
+        results = list(pool.map(run_one, parallel))
+    results.extend(map(run_one, serial))
+    results.sort()
+
+    failed = []
+    for name, rc, output, elapsed in results:
+        print("=" * 72)
+        print("{}  (exit {}, {:.1f}s)".format(name, rc, elapsed))
+        print(output.rstrip())
+        if rc != 0:
+            failed.append(name)
+
+    print("=" * 72)
+    print("{} passed, {} failed in {:.1f}s".format(
+        len(results) - len(failed), len(failed), time.monotonic() - started))
+    for name in failed:
+        print("FAIL " + name)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,14 @@
-import json
-import os
 import sys
 
+from _bootstrap import dumps
+
 
 def main() -> int:
     test_name = "TEST_06_vbox_output_parser"
     about = "VBoxManage output parser extracts only sandbox-relevant fields"
     try:
-        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        if root not in sys.path:
-            sys.path.insert(0, root)
-
         from core.modules.vbox_output_parser import (
+            VMRef,
             parse_list_vms,
             parse_showvminfo,
             parse_snapshot_list,
@@ -24,14 +21,14 @@ def main() -> int:
         )
         vms = parse_list_vms(list_stdout)
         if vms != [
-            {"name": "WindowsSandbox", "uuid": "8e6277b9-72b9-4e35-ba9c-46cf2b24fe87"},
-            {"name": "Spare_Kali", "uuid": "10bc36ea-19bd-4768-b2dd-b61aa60de2eb"},
+            VMRef("WindowsSandbox", "8e6277b9-72b9-4e35-ba9c-46cf2b24fe87"),
+            VMRef("Spare_Kali", "10bc36ea-19bd-4768-b2dd-b61aa60de2eb"),
         ]:
             print(f"[{test_name}] FAIL")
             print(f"About: {about}")
             print("Reason: List VM parsing mismatch")
             print("Output:")
-            print(json.dumps(vms))
+            print(dumps(vms))
             return 1
 
         # --- parse_showvminfo (simplified) ---
@@ -89,7 +86,7 @@ def main() -> int:
                 print(f"About: {about}")
                 print(f"Reason: Check failed: {label}")
                 print("Output:")
-                print(json.dumps(info, indent=2, default=str))
+                print(dumps(info, indent=True))
                 return 1
 
         # --- parse_snapshot_list ---
@@ -113,13 +110,13 @@ def main() -> int:
                 print(f"About: {about}")
                 print(f"Reason: Snapshot check failed: {label}")
                 print("Output:")
-                print(json.dumps(snaps, indent=2))
+                print(dumps(snaps, indent=True))
                 return 1
 
         print(f"[{test_name}] PASS")
         print(f"About: {about}")
         print("Output:")
-        print(json.dumps({"info_keys": list(info.keys()), "nic_count": len(info["network"]), "snapshot_count": len(snaps["snapshots"])}))
+        print(dumps({"info_keys": list(info.keys()), "nic_count": len(info["network"]), "snapshot_count": len(snaps["snapshots"])}))
         return 0
     except Exception as exc:  # noqa: BLE001
         import traceback
@@ -6,22 +6,22 @@ Tests the platform-agnostic parts of the agent:
   - HTTP API routing via a real localhost server
 """
 
-import json
+import http.client
 import os
-import shutil
 import sys
 import tempfile
 import threading
 import time
 
-# Ensure project root is on sys.path
-ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-if ROOT not in sys.path:
-    sys.path.insert(0, ROOT)
+import orjson
+
+from _bootstrap import dumps
 
 TEST_NAME = "TEST_07_agent_core"
 ABOUT = "Guest agent state, artifact packaging, and HTTP API"
 
+_EXECUTE_PAYLOAD = {"filename": "hello.exe", "timeout": 1}
+
 # We need to import after path setup
 from core.agent.isolens_agent import (  # noqa: E402
     AGENT_VERSION,
@@ -40,40 +40,46 @@ def _fail(reason, output=""):
     return 1
 
 
-def _http_get(port, path):
-    """Minimal HTTP GET using only stdlib."""
-    import http.client
-    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+def _wait_until(predicate, timeout=5.0, tick=0.01):
+    """Poll *predicate* every *tick* seconds; False if *timeout* elapses first."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(tick)
+    return True
+
+
+def _http_get(conn, path):
+    """Minimal HTTP GET over the test's shared connection."""
     conn.request("GET", path)
     resp = conn.getresponse()
-    body = resp.read().decode()
-    conn.close()
-    return resp.status, json.loads(body)
+    return resp.status, orjson.loads(resp.read())
 
 
-def _http_post(port, path, payload=None):
-    """Minimal HTTP POST using only stdlib."""
-    import http.client
-    body = json.dumps(payload or {}).encode()
-    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+def _http_post(conn, path, payload=None):
+    """Minimal HTTP POST over the test's shared connection."""
     conn.request(
-        "POST", path, body=body,
+        "POST", path, body=orjson.dumps(payload or {}),
         headers={"Content-Type": "application/json"},
     )
     resp = conn.getresponse()
-    rbody = resp.read().decode()
-    conn.close()
-    return resp.status, json.loads(rbody)
+    return resp.status, orjson.loads(resp.read())
 
 
 def main() -> int:
-    tmpdir = tempfile.mkdtemp(prefix="isolens_agent_test_")
+    with tempfile.TemporaryDirectory(prefix="isolens_agent_test_") as tmpdir:
+        return _run(tmpdir)
+
+
+def _run(tmpdir) -> int:
     share_dir = os.path.join(tmpdir, "share")
     work_dir = os.path.join(tmpdir, "work")
-    os.makedirs(share_dir)
-    os.makedirs(work_dir)
+    for path in (share_dir, work_dir):
+        os.makedirs(path, exist_ok=True)
 
     results = {}
+    conn = None
 
     try:
         # ── 1. AgentState transitions ────────────────────────────────
@@ -86,9 +92,11 @@ def main() -> int:
         d = state.to_dict()
         checks.append(("executing_status", d["status"] == AgentState.EXECUTING))
         checks.append(("executing_sample", d["current_sample"] == "test.exe"))
+        checks.append(("snapshot_reused", state.to_dict() is d))
 
         state.set_collecting()
-        checks.append(("collecting", state.status == AgentState.COLLECTING))
+        d = state.to_dict()
+        checks.append(("collecting", d["status"] == AgentState.COLLECTING))
 
         state.set_error("boom")
         d = state.to_dict()
@@ -104,7 +112,7 @@ def main() -> int:
         for label, ok in checks:
             if not ok:
                 return _fail("AgentState check failed: " + label,
-                             json.dumps(state.to_dict(), indent=2))
+                             dumps(state.to_dict(), indent=True))
 
         results["state_checks"] = len(checks)
 
@@ -115,7 +123,7 @@ def main() -> int:
         arts = agent.list_artifacts()
         if arts:
             return _fail("Expected no artifacts initially",
-                         json.dumps(arts))
+                         dumps(arts))
 
         # Create a fake artifact
         sysmon_dir = os.path.join(work_dir, "artifacts", "sysmon")
@@ -127,7 +135,7 @@ def main() -> int:
         if len(arts) != 1:
             return _fail(
                 "Expected 1 artifact, got {}".format(len(arts)),
-                json.dumps(arts),
+                dumps(arts),
             )
 
         results["artifact_listing"] = "ok"
@@ -142,12 +150,12 @@ def main() -> int:
         if exec_result.get("status") != "complete":
             return _fail(
                 "execute_sample did not return 'complete'",
-                json.dumps(exec_result, indent=2, default=str),
+                dumps(exec_result, indent=True),
             )
 
         pkg = exec_result.get("package")
         if not pkg:
-            return _fail("No package produced", json.dumps(exec_result, indent=2, default=str))
+            return _fail("No package produced", dumps(exec_result, indent=True))
 
         # The zip should exist in the shared folder
         zip_in_share = os.path.join(share_dir, pkg)
@@ -165,112 +173,119 @@ def main() -> int:
         arts = agent.list_artifacts()
         if arts:
             return _fail("Artifacts not cleaned up",
-                         json.dumps(arts))
+                         dumps(arts))
         results["cleanup"] = "ok"
 
         # ── 5. HTTP API ────────────────────────────────────────────
-        # Find a free port (may be restricted in sandboxed environments)
-        import socket
+        # Port 0 lets the OS pick a free port at bind time, so nothing can
+        # take it between choosing and listening.  Binding may still be
+        # restricted in sandboxed environments.
         try:
-            sock = socket.socket()
-            sock.bind(("127.0.0.1", 0))
-            port = sock.getsockname()[1]
-            sock.close()
+            server = create_server(agent, host="127.0.0.1", port=0)
         except PermissionError:
             results["http_api"] = "skipped_permission_error"
             print("[{}] PASS".format(TEST_NAME))
             print("About: {}".format(ABOUT))
             print("Output:")
-            print(json.dumps(results, indent=2))
+            print(dumps(results, indent=True))
             return 0
 
-        server = create_server(agent, host="127.0.0.1", port=port)
-        srv_thread = threading.Thread(target=server.serve_forever, daemon=True)
-        srv_thread.start()
-        time.sleep(0.3)  # Let server bind
+        port = server.server_address[1]
+        # A short poll interval lets shutdown() return promptly at teardown
+        srv_thread = threading.Thread(
+            target=server.serve_forever, kwargs={"poll_interval": 0.05},
+            daemon=True,
+        )
+        srv_thread.start()  # already listening: create_server binds the socket
+
+        # One client for every request.  The agent answers HTTP/1.0 and
+        # closes after each response; http.client reopens the socket itself.
+        conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
 
         # GET /api/status
-        code, body = _http_get(port, "/api/status")
+        code, body = _http_get(conn, "/api/status")
         if code != 200 or body.get("status") != "ok":
             return _fail("GET /api/status failed",
-                         json.dumps({"code": code, "body": body}, indent=2))
+                         dumps({"code": code, "body": body}, indent=True))
 
         data = body["data"]
         if data.get("agent_version") != AGENT_VERSION:
             return _fail(
                 "Version mismatch: {} vs {}".format(
                     data.get("agent_version"), AGENT_VERSION),
-                json.dumps(data, indent=2),
+                dumps(data, indent=True),
             )
 
         results["http_status"] = "ok"
 
         # GET /api/collectors
-        code, body = _http_get(port, "/api/collectors")
+        code, body = _http_get(conn, "/api/collectors")
         if code != 200 or "collectors" not in body.get("data", {}):
             return _fail("GET /api/collectors failed",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_collectors"] = "ok"
 
         # GET /api/artifacts
-        code, body = _http_get(port, "/api/artifacts")
+        code, body = _http_get(conn, "/api/artifacts")
         if code != 200:
             return _fail("GET /api/artifacts failed",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_artifacts"] = "ok"
 
         # POST /api/cleanup
-        code, body = _http_post(port, "/api/cleanup")
+        code, body = _http_post(conn, "/api/cleanup")
         if code != 200:
             return _fail("POST /api/cleanup failed",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_cleanup"] = "ok"
 
         # POST /api/execute (with sample in share)
-        with open(os.path.join(share_dir, "hello.exe"), "wb") as f:
+        with open(os.path.join(share_dir, _EXECUTE_PAYLOAD["filename"]), "wb") as f:
             f.write(b"MZ_test")
 
-        code, body = _http_post(port, "/api/execute",
-                                {"filename": "hello.exe", "timeout": 1})
+        code, body = _http_post(conn, "/api/execute", _EXECUTE_PAYLOAD)
         if code != 200:
             return _fail("POST /api/execute failed",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_execute"] = "ok"
 
         # Wait for background execution to complete
-        time.sleep(5)
+        if not _wait_until(lambda: agent.state.status == AgentState.IDLE):
+            return _fail("Background execution did not finish",
+                         dumps(agent.state.to_dict(), indent=True))
 
         # POST /api/execute without filename → 400
-        code, body = _http_post(port, "/api/execute", {})
+        code, body = _http_post(conn, "/api/execute", {})
         if code != 400:
             return _fail(
                 "Expected 400 for missing filename, got {}".format(code),
-                json.dumps(body, indent=2),
+                dumps(body, indent=True),
             )
         results["http_execute_validation"] = "ok"
 
         # GET unknown route → 404
-        code, body = _http_get(port, "/api/nope")
+        code, body = _http_get(conn, "/api/nope")
         if code != 404:
             return _fail("Expected 404 for unknown route",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_404"] = "ok"
 
         # POST /api/shutdown
-        code, body = _http_post(port, "/api/shutdown")
+        code, body = _http_post(conn, "/api/shutdown")
         if code != 200:
             return _fail("POST /api/shutdown failed",
-                         json.dumps(body, indent=2))
+                         dumps(body, indent=True))
         results["http_shutdown"] = "ok"
 
-        time.sleep(0.5)
         server.shutdown()
+        server.server_close()
+        srv_thread.join(timeout=1.0)
 
         # ── All passed ─────────────────────────────────────────────
         print("[{}] PASS".format(TEST_NAME))
         print("About: {}".format(ABOUT))
         print("Output:")
-        print(json.dumps(results, indent=2))
+        print(dumps(results, indent=True))
         return 0
 
     except Exception as exc:
@@ -282,7 +297,8 @@ def main() -> int:
         traceback.print_exc()
         return 1
     finally:
-        shutil.rmtree(tmpdir, ignore_errors=True)
+        if conn is not None:
+            conn.close()
 
 
 if __name__ == "__main__":
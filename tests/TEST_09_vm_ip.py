@@ -10,34 +10,36 @@ from __future__ import annotations
 
 import json
 import subprocess
-import sys
-import os
 
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+import _bootstrap  # noqa: F401
 
 from core.modules.vbox_output_parser import parse_guest_net_properties
 from core.controller.vbox_controller import VBoxManageClient
 
 TEST_NAME = "TEST_09_vm_ip"
 
-SAMPLE_OUTPUT = """\
-/VirtualBox/GuestInfo/Net/0/MAC          = '080027E3C08F'
-/VirtualBox/GuestInfo/Net/0/Status       = 'Up'
-/VirtualBox/GuestInfo/Net/0/V4/Broadcast = '255.255.255.255'
-/VirtualBox/GuestInfo/Net/0/V4/IP        = '175.20.2.91'
-/VirtualBox/GuestInfo/Net/0/V4/Netmask   = '255.255.252.0'
-/VirtualBox/GuestInfo/Net/1/MAC          = '080027EE2590'
-/VirtualBox/GuestInfo/Net/1/Status       = 'Up'
-/VirtualBox/GuestInfo/Net/1/V4/Broadcast = '255.255.255.255'
-/VirtualBox/GuestInfo/Net/1/V4/IP        = '192.168.56.101'
-/VirtualBox/GuestInfo/Net/1/V4/Netmask   = '255.255.255.0'
-/VirtualBox/GuestInfo/Net/2/MAC          = '080027416E0E'
-/VirtualBox/GuestInfo/Net/2/Status       = 'Up'
-/VirtualBox/GuestInfo/Net/2/V4/Broadcast = '255.255.255.255'
-/VirtualBox/GuestInfo/Net/2/V4/IP        = '10.0.2.15'
-/VirtualBox/GuestInfo/Net/2/V4/Netmask   = '255.255.255.0'
-/VirtualBox/GuestInfo/Net/Count          = '3'
-"""
+SAMPLE_LINES = (
+    "/VirtualBox/GuestInfo/Net/0/MAC          = '080027E3C08F'",
+    "/VirtualBox/GuestInfo/Net/0/Status       = 'Up'",
+    "/VirtualBox/GuestInfo/Net/0/V4/Broadcast = '255.255.255.255'",
+    "/VirtualBox/GuestInfo/Net/0/V4/IP        = '175.20.2.91'",
+    "/VirtualBox/GuestInfo/Net/0/V4/Netmask   = '255.255.252.0'",
+    "/VirtualBox/GuestInfo/Net/1/MAC          = '080027EE2590'",
+    "/VirtualBox/GuestInfo/Net/1/Status       = 'Up'",
+    "/VirtualBox/GuestInfo/Net/1/V4/Broadcast = '255.255.255.255'",
+    "/VirtualBox/GuestInfo/Net/1/V4/IP        = '192.168.56.101'",
+    "/VirtualBox/GuestInfo/Net/1/V4/Netmask   = '255.255.255.0'",
+    "/VirtualBox/GuestInfo/Net/2/MAC          = '080027416E0E'",
+    "/VirtualBox/GuestInfo/Net/2/Status       = 'Up'",
+    "/VirtualBox/GuestInfo/Net/2/V4/Broadcast = '255.255.255.255'",
+    "/VirtualBox/GuestInfo/Net/2/V4/IP        = '10.0.2.15'",
+    "/VirtualBox/GuestInfo/Net/2/V4/Netmask   = '255.255.255.0'",
+    "/VirtualBox/GuestInfo/Net/Count          = '3'",
+)
+
+# parse_guest_net_properties takes raw stdout and scans it in one regex pass,
+# so the sample is handed over in that same shape.
+SAMPLE_OUTPUT = "\n".join(SAMPLE_LINES) + "\n"
 
 
 def test_parser() -> tuple[bool, str]:
@@ -68,12 +70,14 @@ def get_running_vms() -> list[str]:
     try:
         proc = subprocess.run(
             ["VBoxManage", "list", "runningvms"],
-            capture_output=True, text=True, timeout=10,
+            capture_output=True, text=True, errors="replace",
+            timeout=5, check=False,
         )
         vms = []
         for line in proc.stdout.splitlines():
-            if '"' in line:
-                name = line.split('"')[1]
+            # "<name>" {<uuid>}
+            name = line.partition('"')[2].rpartition('"')[0]
+            if name:
                 vms.append(name)
         return vms
     except Exception:
@@ -2,17 +2,29 @@ import json
 import os
 import sys
 
+from _bootstrap import ROOT
+
 
 def main() -> int:
     test_name = "TEST_10_interface_config"
     about = "Interface Next.js and PostCSS configs are correct for fast dev compilation"
     try:
-        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        interface_dir = os.path.join(root, "core", "interface")
+        interface_dir = os.path.join(ROOT, "core", "interface")
+
+        # One directory read answers every existence check below
+        with os.scandir(interface_dir) as it:
+            entries = {entry.name for entry in it}
 
         results = {}
 
         # 1. next.config.ts must contain optimizePackageImports with react-icons
+        if "next.config.ts" not in entries:
+            print(f"[{test_name}] FAIL")
+            print(f"About: {about}")
+            print("Reason: next.config.ts does not exist")
+            print("Output:")
+            print(json.dumps(results))
+            return 1
         next_config_path = os.path.join(interface_dir, "next.config.ts")
         with open(next_config_path, "r") as f:
             next_config_content = f.read()
@@ -31,6 +43,13 @@ def main() -> int:
             return 1
 
         # 2. package.json must NOT contain @tailwindcss/postcss (Tailwind v4 plugin)
+        if "package.json" not in entries:
+            print(f"[{test_name}] FAIL")
+            print(f"About: {about}")
+            print("Reason: package.json does not exist")
+            print("Output:")
+            print(json.dumps(results))
+            return 1
         pkg_path = os.path.join(interface_dir, "package.json")
         with open(pkg_path, "r") as f:
             pkg_data = json.load(f)
@@ -47,8 +66,7 @@ def main() -> int:
             return 1
 
         # 3. postcss.config.mjs (Tailwind v4 style) must NOT exist
-        postcss_mjs_path = os.path.join(interface_dir, "postcss.config.mjs")
-        postcss_mjs_exists = os.path.exists(postcss_mjs_path)
+        postcss_mjs_exists = "postcss.config.mjs" in entries
         results["postcss_config_mjs_exists"] = postcss_mjs_exists
 
         if postcss_mjs_exists:
@@ -60,8 +78,7 @@ def main() -> int:
             return 1
 
         # 4. postcss.config.js (Tailwind v3 style) must exist
-        postcss_js_path = os.path.join(interface_dir, "postcss.config.js")
-        postcss_js_exists = os.path.exists(postcss_js_path)
+        postcss_js_exists = "postcss.config.js" in entries
         results["postcss_config_js_exists"] = postcss_js_exists
 
         if not postcss_js_exists:
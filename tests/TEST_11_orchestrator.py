@@ -5,15 +5,30 @@ Tests the orchestrator logic: initialisation, directory creation,
 dry-run HTTP helpers, and result dataclass serialisation.
 """
 
-import json
+import contextlib
 import os
-import shutil
+import re
 import sys
 import tempfile
 
+from _bootstrap import dumps, source_of
+
+# Imported once for every check; test_imports reports a failure here
+try:
+    from core.controller import sandbox_orchestrator
+    from core.controller.sandbox_orchestrator import (
+        AgentConfig,
+        AnalysisResult,
+        SandboxOrchestrator,
+    )
+    _ORCH_IMPORT_ERR = None
+except Exception as exc:  # noqa: BLE001
+    _ORCH_IMPORT_ERR = exc
+
 TEST_NAME = "TEST_11_orchestrator"
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-sys.path.insert(0, PROJECT_ROOT)
+
+# One pass over the orchestrator source; only ssh/scp are case-insensitive
+_REMOTE_SHELL_PATTERN = re.compile(r"subprocess\.run|(?i:ssh|scp)")
 
 passed = 0
 failed = 0
@@ -35,20 +50,14 @@ def report(name, ok, output, reason=""):
 
 def test_imports():
     """Ensure the orchestrator module can be imported."""
-    try:
-        from core.controller.sandbox_orchestrator import (
-            AgentConfig,
-            AnalysisResult,
-            SandboxOrchestrator,
-        )
+    if _ORCH_IMPORT_ERR is None:
         report("Import orchestrator", True, "AgentConfig, AnalysisResult, SandboxOrchestrator imported")
-    except Exception as exc:
-        report("Import orchestrator", False, str(exc), "Import error")
+    else:
+        report("Import orchestrator", False, str(_ORCH_IMPORT_ERR), "Import error")
 
 
 def test_agent_config_base_url():
     """AgentConfig builds a correct base URL."""
-    from core.controller.sandbox_orchestrator import AgentConfig
     cfg = AgentConfig(host="10.0.0.1", port=8080)
     url = cfg.base_url
     ok = url == "http://10.0.0.1:8080"
@@ -57,7 +66,6 @@ def test_agent_config_base_url():
 
 def test_analysis_result_to_dict():
     """AnalysisResult.to_dict() returns all expected fields."""
-    from core.controller.sandbox_orchestrator import AnalysisResult
     result = AnalysisResult(
         analysis_id="20260228_120000_abc12345",
         sample_name="test.exe",
@@ -78,93 +86,60 @@ def test_analysis_result_to_dict():
     report(
         "AnalysisResult.to_dict()",
         ok,
-        json.dumps(d, indent=2, default=str),
+        dumps(d, indent=True),
         f"Missing keys: {missing}" if missing else "",
     )
 
 
-def test_orchestrator_init_creates_dirs():
-    """SandboxOrchestrator.__init__ creates required directories."""
-    from core.controller.sandbox_orchestrator import (
-        AgentConfig,
-        SandboxOrchestrator,
-    )
-    tmp = tempfile.mkdtemp(prefix="isolens_test_orch_")
-    try:
-        orch = SandboxOrchestrator(
+@contextlib.contextmanager
+def _dry_run_orchestrator():
+    """Yield a dry-run SandboxOrchestrator rooted in a throwaway directory."""
+    with tempfile.TemporaryDirectory(prefix="isolens_test_orch_") as tmp:
+        yield SandboxOrchestrator(
             agent_config=AgentConfig(),
             share_dir=os.path.join(tmp, "share"),
             samples_dir=os.path.join(tmp, "samples"),
             reports_dir=os.path.join(tmp, "reports"),
             dry_run=True,
         )
-        dirs_exist = all(
-            os.path.isdir(d)
-            for d in [orch.share_dir, orch.samples_dir, orch.reports_dir]
-        )
-        ok = dirs_exist and orch.current_analysis is None
-        report(
-            "Orchestrator init creates dirs",
-            ok,
-            f"share={os.path.isdir(orch.share_dir)} "
-            f"samples={os.path.isdir(orch.samples_dir)} "
-            f"reports={os.path.isdir(orch.reports_dir)}",
-        )
-    finally:
-        shutil.rmtree(tmp, ignore_errors=True)
 
 
-def test_dry_run_get():
-    """Dry-run GET returns stub response."""
-    from core.controller.sandbox_orchestrator import (
-        AgentConfig,
-        SandboxOrchestrator,
+def test_orchestrator_init_creates_dirs(orch):
+    """SandboxOrchestrator.__init__ creates required directories."""
+    dirs_exist = all(
+        os.path.isdir(d)
+        for d in [orch.share_dir, orch.samples_dir, orch.reports_dir]
     )
-    tmp = tempfile.mkdtemp(prefix="isolens_test_orch_")
-    try:
-        orch = SandboxOrchestrator(
-            agent_config=AgentConfig(),
-            share_dir=os.path.join(tmp, "share"),
-            samples_dir=os.path.join(tmp, "samples"),
-            reports_dir=os.path.join(tmp, "reports"),
-            dry_run=True,
-        )
-        resp = orch._agent_get("/api/status")
-        ok = resp.get("status") == "ok"
-        report("Dry-run GET", ok, json.dumps(resp))
-    finally:
-        shutil.rmtree(tmp, ignore_errors=True)
+    ok = dirs_exist and orch.current_analysis is None
+    report(
+        "Orchestrator init creates dirs",
+        ok,
+        f"share={os.path.isdir(orch.share_dir)} "
+        f"samples={os.path.isdir(orch.samples_dir)} "
+        f"reports={os.path.isdir(orch.reports_dir)}",
+    )
+
+
+def test_dry_run_get(orch):
+    """Dry-run GET returns stub response."""
+    resp = orch._agent_get("/api/status")
+    ok = resp.get("status") == "ok"
+    report("Dry-run GET", ok, dumps(resp))
 
 
-def test_dry_run_post():
+def test_dry_run_post(orch):
     """Dry-run POST returns stub response."""
-    from core.controller.sandbox_orchestrator import (
-        AgentConfig,
-        SandboxOrchestrator,
-    )
-    tmp = tempfile.mkdtemp(prefix="isolens_test_orch_")
-    try:
-        orch = SandboxOrchestrator(
-            agent_config=AgentConfig(),
-            share_dir=os.path.join(tmp, "share"),
-            samples_dir=os.path.join(tmp, "samples"),
-            reports_dir=os.path.join(tmp, "reports"),
-            dry_run=True,
-        )
-        resp = orch._agent_post("/api/execute", {"filename": "test.exe", "timeout": 30})
-        ok = resp.get("status") == "ok"
-        report("Dry-run POST", ok, json.dumps(resp))
-    finally:
-        shutil.rmtree(tmp, ignore_errors=True)
+    resp = orch._agent_post("/api/execute", {"filename": "test.exe", "timeout": 30})
+    ok = resp.get("status") == "ok"
+    report("Dry-run POST", ok, dumps(resp))
 
 
 def test_no_ssh_references():
     """Orchestrator must NOT contain SSH/SCP logic."""
-    import inspect
-    from core.controller import sandbox_orchestrator as mod
-    source = inspect.getsource(mod)
-    has_ssh = "subprocess.run" in source and "ssh" in source.lower()
-    has_scp = "scp" in source.lower()
+    source = source_of(sandbox_orchestrator)
+    hits = {m.group(0).lower() for m in _REMOTE_SHELL_PATTERN.finditer(source)}
+    has_ssh = "subprocess.run" in hits and "ssh" in hits
+    has_scp = "scp" in hits
     ok = not has_ssh and not has_scp
     report(
         "No SSH/SCP in orchestrator",
@@ -182,9 +157,12 @@ if __name__ == "__main__":
     test_imports()
     test_agent_config_base_url()
     test_analysis_result_to_dict()
-    test_orchestrator_init_creates_dirs()
-    test_dry_run_get()
-    test_dry_run_post()
+    # One dry-run orchestrator serves all three checks; the init check
+    # runs first, before the dry-run calls touch it
+    with _dry_run_orchestrator() as orch:
+        test_orchestrator_init_creates_dirs(orch)
+        test_dry_run_get(orch)
+        test_dry_run_post(orch)
     test_no_ssh_references()
 
     total = passed + failed
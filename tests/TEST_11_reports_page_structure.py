@@ -1,22 +1,81 @@
 """TEST_11: Verify reports page structure and required components exist."""
 import json
 import os
+import re
 import sys
 
+from _bootstrap import ROOT
+
+REQUIRED_COMPONENTS = (
+    "Panel",
+    "NoData",
+    "MiniStat",
+    "FPath",
+    "DataGrid",
+    "ScreenshotGallery",
+    "SysmonSection",
+    "ProcmonSection",
+    "NetworkSection",
+    "HandleSection",
+    "TcpvconSection",
+    "CollectorBadges",
+    "ReportsPage",
+)
+
+# Each section should have a NoData fallback when data is absent
+NODATA_PATTERNS = (
+    "No Sysmon data collected",
+    "No Procmon data collected",
+    "No network capture data",
+    "No handle snapshot data",
+    "No active TCP/UDP connections captured",
+)
+
+REQUIRED_IMPORTS = (
+    "SysmonData",
+    "ProcmonData",
+    "NetworkData",
+    "TcpvconRow",
+    "ReportData",
+    "screenshotURL",
+    "getReportData",
+)
+
+# Each check is one pass over page.tsx instead of one scan per needle.
+# Identifiers are matched as whole words so that e.g. ReportData inside
+# getReportData cannot hide (or stand in for) a separate match.  Every
+# needle is ASCII, so the file is searched as raw bytes without decoding.
+_FUNCTION_DEF = re.compile(rb"\bfunction\s+([A-Za-z_$][\w$]*)")
+_NODATA = re.compile(b"|".join(re.escape(p.encode()) for p in NODATA_PATTERNS))
+_IMPORT_NAMES = re.compile(
+    rb"\b(?:" + b"|".join(name.encode() for name in REQUIRED_IMPORTS) + rb")\b"
+)
+
+
+def _found(pattern, content) -> set:
+    """Decoded set of every match (or first group) of *pattern* in *content*."""
+    return {match.decode() for match in pattern.findall(content)}
+
 
 def main() -> int:
     test_name = "TEST_11_reports_page_structure"
     about = "Reports page.tsx exists, compiles (no syntax issues), and contains key UI components"
     try:
-        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        reports_path = os.path.join(
-            root, "core", "interface", "src", "app", "reports", "page.tsx"
-        )
+        reports_dir = os.path.join(ROOT, "core", "interface", "src", "app", "reports")
+        reports_path = os.path.join(reports_dir, "page.tsx")
+
+        # One directory read answers both the page.tsx and .bak checks
+        try:
+            with os.scandir(reports_dir) as it:
+                entries = {entry.name: entry for entry in it}
+        except FileNotFoundError:
+            entries = {}
 
         results = {}
 
         # 1. File must exist
-        if not os.path.isfile(reports_path):
+        page = entries.get("page.tsx")
+        if page is None or not page.is_file():
             print(f"[{test_name}] FAIL")
             print(f"About: {about}")
             print("Reason: reports/page.tsx does not exist")
@@ -24,34 +83,17 @@ def main() -> int:
             return 1
         results["file_exists"] = True
 
-        with open(reports_path, "r") as f:
+        # Read once as bytes; every check below scans the same buffer
+        with open(reports_path, "rb") as f:
             content = f.read()
 
         results["file_length"] = len(content)
 
         # 2. Required component definitions
-        required_components = [
-            "Panel",
-            "NoData",
-            "MiniStat",
-            "FPath",
-            "DataGrid",
-            "ScreenshotGallery",
-            "SysmonSection",
-            "ProcmonSection",
-            "NetworkSection",
-            "HandleSection",
-            "TcpvconSection",
-            "CollectorBadges",
-            "ReportsPage",
-        ]
-        missing = []
-        for comp in required_components:
-            # Check for function definition
-            if f"function {comp}" not in content:
-                missing.append(comp)
-
-        results["required_components"] = required_components
+        defined = _found(_FUNCTION_DEF, content)
+        missing = [comp for comp in REQUIRED_COMPONENTS if comp not in defined]
+
+        results["required_components"] = REQUIRED_COMPONENTS
         results["missing_components"] = missing
 
         if missing:
@@ -62,20 +104,10 @@ def main() -> int:
             return 1
 
         # 3. All collector sections always rendered (NoData fallback pattern)
-        # Each section should have a NoData fallback when data is absent
-        nodata_patterns = [
-            "No Sysmon data collected",
-            "No Procmon data collected",
-            "No network capture data",
-            "No handle snapshot data",
-            "No active TCP/UDP connections captured",
-        ]
-        missing_nodata = []
-        for pattern in nodata_patterns:
-            if pattern not in content:
-                missing_nodata.append(pattern)
-
-        results["nodata_fallback_patterns"] = nodata_patterns
+        found_nodata = _found(_NODATA, content)
+        missing_nodata = [p for p in NODATA_PATTERNS if p not in found_nodata]
+
+        results["nodata_fallback_patterns"] = NODATA_PATTERNS
         results["missing_nodata_fallbacks"] = missing_nodata
 
         if missing_nodata:
@@ -88,16 +120,8 @@ def main() -> int:
             return 1
 
         # 4. Required imports from api.ts
-        required_imports = [
-            "SysmonData",
-            "ProcmonData",
-            "NetworkData",
-            "TcpvconRow",
-            "ReportData",
-            "screenshotURL",
-            "getReportData",
-        ]
-        missing_imports = [imp for imp in required_imports if imp not in content]
+        found_imports = _found(_IMPORT_NAMES, content)
+        missing_imports = [imp for imp in REQUIRED_IMPORTS if imp not in found_imports]
         results["missing_imports"] = missing_imports
 
         if missing_imports:
@@ -110,7 +134,7 @@ def main() -> int:
             return 1
 
         # 5. Screenshot onError handler exists (prevents broken images)
-        has_onerror = "onError" in content
+        has_onerror = b"onError" in content
         results["has_screenshot_onerror"] = has_onerror
         if not has_onerror:
             print(f"[{test_name}] FAIL")
@@ -120,8 +144,8 @@ def main() -> int:
             return 1
 
         # 6. No .bak file lingering
-        bak_path = reports_path + ".bak"
-        results["bak_file_exists"] = os.path.isfile(bak_path)
+        bak = entries.get("page.tsx.bak")
+        results["bak_file_exists"] = bak is not None and bak.is_file()
 
         print(f"[{test_name}] PASS")
         print(f"About: {about}")
@@ -4,14 +4,15 @@ import os
 import sys
 import ast
 
+from _bootstrap import ROOT
+
 
 def main() -> int:
     test_name = "TEST_12_analysis_routes_imports"
     about = "analysis_routes.py has json/csv/io at module level and serve_report_file has artifacts fallback"
     try:
-        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         routes_path = os.path.join(
-            root, "core", "gateway", "analysis_routes.py"
+            ROOT, "core", "gateway", "analysis_routes.py"
         )
 
         results = {}
@@ -22,7 +23,9 @@ def main() -> int:
             print("Reason: analysis_routes.py does not exist")
             return 1
 
-        with open(routes_path, "r") as f:
+        # Read as bytes: ast.parse decodes per the source's own encoding
+        # rules, and the fallback check is an ASCII substring search.
+        with open(routes_path, "rb") as f:
             content = f.read()
 
         # Parse the AST to check top-level imports
@@ -39,17 +42,11 @@ def main() -> int:
 
         results["top_level_imports"] = sorted(top_level_imports)
 
-        # Check that json, csv, io are imported at module level
-        required = {"json", "csv", "io"}
-        # csv may be imported as 'import csv as csv_mod'
-        # Check raw content for these
-        has_json = "import json" in content.split("\n")[:30] or any(
-            isinstance(n, ast.Import) and any(a.name == "json" for a in n.names)
-            for n in ast.iter_child_nodes(tree)
-            if isinstance(n, ast.Import)
-        )
-        has_csv = "import csv" in content
-        has_io = "import io" in content
+        # Check that json, csv, io are imported at module level; the AST
+        # pass above already records 'import csv as csv_mod' as "csv"
+        has_json = "json" in top_level_imports
+        has_csv = "csv" in top_level_imports
+        has_io = "io" in top_level_imports
 
         results["has_module_level_json"] = has_json
         results["has_module_level_csv"] = has_csv
@@ -71,7 +68,7 @@ def main() -> int:
             return 1
 
         # Check that serve_report_file has artifacts fallback
-        has_artifacts_fallback = "artifacts" in content and "serve_report_file" in content
+        has_artifacts_fallback = b"artifacts" in content and b"serve_report_file" in content
         results["has_artifacts_fallback"] = has_artifacts_fallback
 
         if not has_artifacts_fallback:
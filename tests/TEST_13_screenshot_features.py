@@ -9,13 +9,18 @@ Verifies:
   - Agent version bumped to 1.3.0
 """
 
-import inspect
 import os
+import re
 import sys
 
+from _bootstrap import ROOT as PROJECT_ROOT, param_names, source_of
+
 TEST_NAME = "TEST_13_screenshot_features"
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-sys.path.insert(0, PROJECT_ROOT)
+
+# GUI-phase markers in malware_emulator.cs, found in one pass
+_EMULATOR_GUI_MARKERS = re.compile(
+    rb"PhaseGUIActivity|README_DECRYPT|notepad\.exe|c2_beacon\.ps1"
+)
 
 passed = 0
 failed = 0
@@ -60,8 +65,7 @@ def test_screenshot_collector_lifecycle():
 def test_screenshot_collector_start_signature():
     """start_capture should accept an interval parameter."""
     from core.agent.isolens_agent import ScreenshotCollector
-    sig = inspect.signature(ScreenshotCollector.start_capture)
-    params = list(sig.parameters.keys())
+    params = param_names(ScreenshotCollector.start_capture)
     has_interval = "interval" in params
     ok = has_interval
     report(
@@ -75,8 +79,7 @@ def test_screenshot_collector_start_signature():
 def test_execute_sample_screenshot_interval():
     """execute_sample should accept screenshot_interval parameter."""
     from core.agent.isolens_agent import IsoLensAgent
-    sig = inspect.signature(IsoLensAgent.execute_sample)
-    params = list(sig.parameters.keys())
+    params = param_names(IsoLensAgent.execute_sample)
     ok = "screenshot_interval" in params
     report(
         "execute_sample has screenshot_interval",
@@ -89,7 +92,7 @@ def test_execute_sample_screenshot_interval():
 def test_schtasks_launch():
     """execute_sample should use schtasks for interactive session launch."""
     from core.agent.isolens_agent import IsoLensAgent
-    source = inspect.getsource(IsoLensAgent.execute_sample)
+    source = source_of(IsoLensAgent.execute_sample)
     has_schtasks = "schtasks" in source
     has_interactive = "/it" in source
     ok = has_schtasks and has_interactive
@@ -118,8 +121,7 @@ def test_orchestrator_vboxmanage_screenshots():
 def test_orchestrator_screenshot_interval():
     """Orchestrator run_analysis should accept screenshot_interval."""
     from core.controller.sandbox_orchestrator import SandboxOrchestrator
-    sig = inspect.signature(SandboxOrchestrator.run_analysis)
-    params = list(sig.parameters.keys())
+    params = param_names(SandboxOrchestrator.run_analysis)
     ok = "screenshot_interval" in params
     report(
         "Orchestrator screenshot_interval param",
@@ -148,12 +150,12 @@ def test_malware_emulator_gui_phase():
     if not os.path.isfile(emulator_path):
         report("Emulator GUI phase", False, "File not found", emulator_path)
         return
-    with open(emulator_path, "r") as f:
-        source = f.read()
-    has_phase = "PhaseGUIActivity" in source
-    has_ransom = "README_DECRYPT" in source
-    has_notepad = "notepad.exe" in source
-    has_ps = "c2_beacon.ps1" in source
+    with open(emulator_path, "rb") as f:
+        found = set(_EMULATOR_GUI_MARKERS.findall(f.read()))
+    has_phase = b"PhaseGUIActivity" in found
+    has_ransom = b"README_DECRYPT" in found
+    has_notepad = b"notepad.exe" in found
+    has_ps = b"c2_beacon.ps1" in found
     ok = has_phase and has_ransom and has_notepad and has_ps
     report(
         "Emulator GUI phase",
@@ -167,8 +169,7 @@ def test_malware_emulator_gui_phase():
 def test_gateway_screenshot_interval():
     """Gateway submit_analysis should accept screenshot_interval."""
     from core.gateway.analysis_routes import submit_analysis
-    sig = inspect.signature(submit_analysis)
-    params = list(sig.parameters.keys())
+    params = param_names(submit_analysis)
     ok = "screenshot_interval" in params
     report(
         "Gateway screenshot_interval param",
@@ -6,9 +6,12 @@ import os
 import re
 import sys
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+from _bootstrap import ROOT as PROJECT_ROOT, read_text as read
+
 INTERFACE = os.path.join(PROJECT_ROOT, "core", "interface", "src")
 
+_EXPORT_FN_RE = re.compile(r"export (?:async )?function (\w+)")
+
 PASS_COUNT = 0
 FAIL_COUNT = 0
 
@@ -25,11 +28,6 @@ def check(name, about, condition, output):
     print(f"  Output: {output}")
 
 
-def read(path):
-    with open(path, "r") as f:
-        return f.read()
-
-
 # ── Check API utility exists ──────────────────────────────────────────
 
 api_path = os.path.join(INTERFACE, "lib", "api.ts")
@@ -43,7 +41,7 @@ check(
 
 if api_exists:
     api_src = read(api_path)
-    exports = re.findall(r"export (?:async )?function (\w+)", api_src)
+    exports = _EXPORT_FN_RE.findall(api_src)
     check(
         "API lib has all functions",
         "API utility exports essential functions",
@@ -71,28 +69,44 @@ check(
 
 # ── Check pages import from @/lib/api ────────────────────────────────
 
-pages_to_check = {
-    "scan": os.path.join(INTERFACE, "app", "scan", "page.tsx"),
-    "reports": os.path.join(INTERFACE, "app", "reports", "page.tsx"),
-    "sandbox": os.path.join(INTERFACE, "app", "sandbox", "page.tsx"),
-    "scan-history": os.path.join(INTERFACE, "app", "scan-history", "page.tsx"),
-    "settings": os.path.join(INTERFACE, "app", "settings", "page.tsx"),
-    "help-support": os.path.join(INTERFACE, "app", "help-support", "page.tsx"),
-}
-
-for name, path in pages_to_check.items():
-    src = read(path)
-    uses_api = "@/lib/api" in src
+PAGES = ["scan", "reports", "sandbox", "scan-history", "settings", "help-support"]
+
+
+def _page_files(app_dir, names):
+    """Map each page name to its app/<name>/page.tsx path, or None if absent.
+
+    One scandir of app/ and one of each page directory replaces a stat per
+    candidate path.
+    """
+    with os.scandir(app_dir) as it:
+        dirs = {e.name: e.path for e in it if e.is_dir()}
+    paths = {}
+    for name in names:
+        paths[name] = None
+        if name in dirs:
+            with os.scandir(dirs[name]) as it:
+                paths[name] = next(
+                    (e.path for e in it if e.name == "page.tsx" and e.is_file()), None
+                )
+    return paths
+
+
+page_paths = _page_files(os.path.join(INTERFACE, "app"), PAGES)
+# A missing page reads as empty, so its checks FAIL instead of aborting the run
+page_src = {name: read(path) if path else "" for name, path in page_paths.items()}
+
+for name in PAGES:
+    uses_api = "@/lib/api" in page_src[name]
     check(
         f"{name} uses API lib",
         f"{name}/page.tsx imports from @/lib/api",
         uses_api,
-        f"imports_api={uses_api}",
+        f"imports_api={uses_api}, exists={page_paths[name] is not None}",
     )
 
 # ── Check NO mock data in scan page ──────────────────────────────────
 
-scan_src = read(pages_to_check["scan"])
+scan_src = page_src["scan"]
 has_mock = "mockScans" in scan_src or "Mock Data" in scan_src
 check(
     "Scan page no mock data",
@@ -114,7 +128,7 @@ check(
 
 # ── Check reports page shows screenshots ─────────────────────────────
 
-reports_src = read(pages_to_check["reports"])
+reports_src = page_src["reports"]
 has_screenshots = "screenshotURL" in reports_src and ("listScreenshots" in reports_src or "getReportData" in reports_src)
 check(
     "Reports page shows screenshots",
@@ -125,7 +139,7 @@ check(
 
 # ── Check sandbox page has VM controls ──────────────────────────────
 
-sandbox_src = read(pages_to_check["sandbox"])
+sandbox_src = page_src["sandbox"]
 has_start = "startVM" in sandbox_src
 has_poweroff = "poweroffVM" in sandbox_src
 has_agent = "getAgentStatus" in sandbox_src
@@ -138,7 +152,7 @@ check(
 
 # ── Check scan-history page has mock data removed ──────────────────
 
-history_src = read(pages_to_check["scan-history"])
+history_src = page_src["scan-history"]
 has_old_mock = "mockScans" in history_src
 has_coming_soon = "Coming Soon" in history_src
 check(
@@ -150,7 +164,7 @@ check(
 
 # ── Check settings has coming soon labels ───────────────────────────
 
-settings_src = read(pages_to_check["settings"])
+settings_src = page_src["settings"]
 settings_coming_soon = "Coming Soon" in settings_src
 settings_uses_api = "getVersion" in settings_src or "ping" in settings_src
 check(
@@ -199,7 +213,7 @@ check(
 
 # ── Check reports page has two tabs (Report + AI Summary) ───────────
 
-reports_src_full = read(pages_to_check["reports"])
+reports_src_full = page_src["reports"]
 has_report_tab = 'activeTab === "report"' in reports_src_full or "activeTab" in reports_src_full
 has_ai_tab = "AI Analysis" in reports_src_full or "AI Summary" in reports_src_full or "Coming Soon" in reports_src_full
 has_sysmon_section = "SysmonSection" in reports_src_full
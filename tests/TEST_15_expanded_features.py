@@ -12,14 +12,18 @@ Verifies:
   8. Reports page has clear all button
 """
 
+import inspect
 import json
 import os
 import re
 import sys
 
+from _bootstrap import ROOT as PROJECT_ROOT, read_text
+
+from core.controller.vbox_controller import VBoxManageClient
+from core.modules.vbox_output_parser import parse_showvminfo
+
 TEST_NAME = "TEST_15_expanded_features"
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
-sys.path.insert(0, PROJECT_ROOT)
 
 passed = 0
 failed = 0
@@ -45,8 +49,6 @@ def report(name, ok, output, reason=""):
 
 def test_parser_expanded_fields():
     """parse_showvminfo should extract vram, chipset, firmware, graphics, vrde."""
-    from core.modules.vbox_output_parser import parse_showvminfo
-
     sample = (
         'name="WindowsSandbox"\n'
         'UUID="8e6277b9-72b9-4e35-ba9c-46cf2b24fe87"\n'
@@ -70,24 +72,27 @@ def test_parser_expanded_fields():
     )
     info = parse_showvminfo(sample)
 
-    checks = {
-        "vram_mb": (info.get("vram_mb"), 128),
-        "chipset": (info.get("chipset"), "piix3"),
-        "firmware": (info.get("firmware"), "BIOS"),
-        "graphics_controller": (info.get("graphics_controller"), "vboxsvga"),
-        "accelerate_3d": (info.get("accelerate_3d"), False),
-        "vrde": (info.get("vrde"), True),
-        "vrde_port": (info.get("vrde_port"), 3389),
-        "vrde_auth_type": (info.get("vrde_auth_type"), "null"),
+    expected = {
+        "vram_mb": 128,
+        "chipset": "piix3",
+        "firmware": "BIOS",
+        "graphics_controller": "vboxsvga",
+        "accelerate_3d": False,
+        "vrde": True,
+        "vrde_port": 3389,
+        "vrde_auth_type": "null",
     }
+    got = {key: info.get(key) for key in expected}
+    all_ok = got == expected
 
-    all_ok = True
-    details = []
-    for key, (got, expected) in checks.items():
-        ok = got == expected
-        details.append(f"{key}: {'✓' if ok else '✗'} (got={got!r}, expected={expected!r})")
-        if not ok:
-            all_ok = False
+    if all_ok:
+        details = [f"{key}={value!r}" for key, value in got.items()]
+    else:
+        # Per-field verdicts are only worth building when something is off
+        details = [
+            f"{key}: {'✓' if got[key] == want else '✗'} (got={got[key]!r}, expected={want!r})"
+            for key, want in expected.items()
+        ]
 
     report(
         "Parser expanded fields",
@@ -103,11 +108,9 @@ def test_parser_expanded_fields():
 
 def test_screenshot_vm_method():
     """VBoxManageClient should have a screenshot_vm method."""
-    from core.controller.vbox_controller import VBoxManageClient
     has_method = hasattr(VBoxManageClient, "screenshot_vm")
     sig = ""
     if has_method:
-        import inspect
         sig = str(inspect.signature(VBoxManageClient.screenshot_vm))
     report(
         "VBoxManageClient.screenshot_vm exists",
@@ -124,8 +127,7 @@ def test_screenshot_vm_method():
 def test_controller_screen_endpoint():
     """controller_routes.py should define vm_live_screenshot endpoint."""
     path = os.path.join(PROJECT_ROOT, "core", "gateway", "controller_routes.py")
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_decorator = '@router.get("/screen")' in content
     has_function = "def vm_live_screenshot" in content
     ok = has_decorator and has_function
@@ -144,8 +146,7 @@ def test_controller_screen_endpoint():
 def test_clear_reports_endpoint():
     """analysis_routes.py should define clear_all_reports endpoint."""
     path = os.path.join(PROJECT_ROOT, "core", "gateway", "analysis_routes.py")
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_decorator = '@router.delete("/reports/clear"' in content
     has_function = "def clear_all_reports" in content
     ok = has_decorator and has_function
@@ -164,8 +165,7 @@ def test_clear_reports_endpoint():
 def test_api_ts_exports():
     """api.ts should export vmScreenURL and clearAllReports functions."""
     path = os.path.join(PROJECT_ROOT, "core", "interface", "src", "lib", "api.ts")
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_screen = "export function vmScreenURL" in content
     has_clear = "export async function clearAllReports" in content
     ok = has_screen and has_clear
@@ -186,8 +186,7 @@ def test_no_restore_button():
     path = os.path.join(
         PROJECT_ROOT, "core", "interface", "src", "app", "sandbox", "page.tsx"
     )
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_restore_handler = "handleRestore" in content
     has_restore_button = "Restore Snapshot" in content
     has_import = "restoreCurrentSnapshot" in content
@@ -209,8 +208,7 @@ def test_live_preview_section():
     path = os.path.join(
         PROJECT_ROOT, "core", "interface", "src", "app", "sandbox", "page.tsx"
     )
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_preview_state = "previewEnabled" in content
     has_preview_component = "Live VM Preview" in content
     has_screen_import = "vmScreenURL" in content
@@ -233,8 +231,7 @@ def test_reports_clear_button():
     path = os.path.join(
         PROJECT_ROOT, "core", "interface", "src", "app", "reports", "page.tsx"
     )
-    with open(path, "r") as f:
-        content = f.read()
+    content = read_text(path)
     has_clear_import = "clearAllReports" in content
     has_clear_handler = "handleClearAll" in content
     has_confirm_dialog = "showClearConfirm" in content
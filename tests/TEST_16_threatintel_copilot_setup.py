@@ -3,14 +3,17 @@
 
 from __future__ import annotations
 
+import contextlib
+import io
 import json
+import os
 import subprocess
 import sys
 from pathlib import Path
 
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.insert(0, str(ROOT))
+import _bootstrap
+
+ROOT = Path(_bootstrap.ROOT)
 
 TEST_NAME = "TEST_16_threatintel_copilot_setup"
 ABOUT = "Threatintelligence Copilot setup provides local agent listing and agent prompt routing"
@@ -25,6 +28,26 @@ def _fail(reason: str, output: str) -> int:
     return 1
 
 
+def _run_cli(*argv: str) -> tuple[int, str, str]:
+    """Run copilot_cli in-process, or as a real subprocess when
+    ISOLENS_TEST_CLI_SUBPROCESS is set (smoke-tests direct execution)."""
+    if os.environ.get("ISOLENS_TEST_CLI_SUBPROCESS"):
+        cli_cmd = [
+            sys.executable,
+            str(ROOT / "core" / "threatintelligence" / "copilot_cli.py"),
+            *argv,
+        ]
+        proc = subprocess.run(cli_cmd, capture_output=True, text=True, check=False)
+        return proc.returncode, proc.stdout, proc.stderr
+
+    from core.threatintelligence import copilot_cli
+
+    out, err = io.StringIO(), io.StringIO()
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        returncode = copilot_cli.main(list(argv))
+    return returncode, out.getvalue(), err.getvalue()
+
+
 def main() -> int:
     raw_output: dict[str, object] = {}
 
@@ -47,20 +70,15 @@ def main() -> int:
         if not rendered_prompt.startswith(f"/agent {names[0]}\n"):
             return _fail("Agent switch prompt format is invalid", json.dumps(raw_output, indent=2))
 
-        cli_cmd = [
-            sys.executable,
-            str(ROOT / "core" / "threatintelligence" / "copilot_cli.py"),
-            "list-agents",
-        ]
-        proc = subprocess.run(cli_cmd, capture_output=True, text=True, check=False)
-        raw_output["cli_returncode"] = proc.returncode
-        raw_output["cli_stdout"] = proc.stdout
-        raw_output["cli_stderr"] = proc.stderr
+        returncode, stdout, stderr = _run_cli("list-agents")
+        raw_output["cli_returncode"] = returncode
+        raw_output["cli_stdout"] = stdout
+        raw_output["cli_stderr"] = stderr
 
-        if proc.returncode != 0:
+        if returncode != 0:
             return _fail("CLI list-agents command failed", json.dumps(raw_output, indent=2))
 
-        listed = json.loads(proc.stdout)
+        listed = json.loads(stdout)
         raw_output["cli_agents_count"] = len(listed)
         if not isinstance(listed, list) or not listed:
             return _fail("CLI list-agents returned empty/non-list payload", json.dumps(raw_output, indent=2))
@@ -5,7 +5,8 @@ import os
 import re
 import sys
 
-PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+from _bootstrap import ROOT as PROJECT_ROOT, read_text as read
+
 INTERFACE = os.path.join(PROJECT_ROOT, "core", "interface", "src")
 
 PASS_COUNT = 0
@@ -24,11 +25,6 @@ def check(name, about, condition, output):
     print(f"  Output: {output}")
 
 
-def read(path):
-    with open(path, "r") as f:
-        return f.read()
-
-
 # ─── 1. API lib has AI types and functions ───────────────────────────────
 
 api_path = os.path.join(INTERFACE, "lib", "api.ts")
@@ -65,35 +61,68 @@ if not reports_exists:
     print(f"\nTotal: {PASS_COUNT} PASS, {FAIL_COUNT} FAIL")
     sys.exit(1 if FAIL_COUNT else 0)
 
-rpt = read(reports_path)
+AI_IMPORTS = ["getAIReport", "runAIAnalysis", "AIReport", "AIToolResult"]
+AI_COMPONENTS = ["AIAnalysisTab", "RiskGauge", "VerdictBadge", "SeverityBadge"]
+AI_FIELDS = ["key_findings", "iocs", "mitre_attack", "recommendations"]
+PRESERVED_COMPONENTS = ["SysmonSection", "ProcmonSection", "NetworkSection", "HandleSection",
+                        "TcpvconSection", "ScreenshotGallery", "CollectorBadges"]
+
+NEEDLES = {
+    *AI_IMPORTS,
+    *(f"function {c}" for c in AI_COMPONENTS + PRESERVED_COMPONENTS),
+    *AI_FIELDS,
+    *(f"aiReport.{f}" for f in AI_FIELDS),
+    *(f".{f}" for f in AI_FIELDS),
+    "AI Analysis", 'setActiveTab("ai")', "risk_score", "threat_level",
+    "MITRE", "Indicators of Compromise", "executive_summary", "Executive Summary",
+    "Recommendations", "tool_results", "Per-Tool Agent",
+    "getAIReport(report.analysis_id)", "searchQuery", "Search reports",
+}
+
+
+def _find_needles(text, needles):
+    """Subset of *needles* occurring in *text*, found in one regex pass.
+
+    The lookahead tries the needles longest-first at every offset, so each
+    match is the longest needle starting there; every shorter needle starting
+    at the same offset is a prefix of it, which recovers overlapping needles
+    such as "getAIReport" inside "getAIReport(report.analysis_id)".
+    """
+    ordered = sorted(needles, key=len, reverse=True)
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, ordered)) + "))")
+    longest = set(pattern.findall(text))
+    return {n for n in needles if any(m.startswith(n) for m in longest)}
+
+
+found = _find_needles(read(reports_path), NEEDLES)
 
 # Must import AI types from api.ts
-for sym in ["getAIReport", "runAIAnalysis", "AIReport", "AIToolResult"]:
+for sym in AI_IMPORTS:
     check(
         f"reports_imports_{sym}",
         f"reports/page.tsx imports {sym}",
-        sym in rpt,
-        f"found={sym in rpt}",
+        sym in found,
+        f"found={sym in found}",
     )
 
 # ─── 3. Key AI components exist ─────────────────────────────────────────
 
-for component in ["AIAnalysisTab", "RiskGauge", "VerdictBadge", "SeverityBadge"]:
+for component in AI_COMPONENTS:
     check(
         f"has_{component}",
         f"reports/page.tsx contains {component} component",
-        f"function {component}" in rpt,
-        f"found={'function ' + component in rpt}",
+        f"function {component}" in found,
+        f"found={'function ' + component in found}",
     )
 
 # ─── 4. JSON data consumption (replaced XML parsers) ───────────────────
 
-for field in ["key_findings", "iocs", "mitre_attack", "recommendations"]:
+for field in AI_FIELDS:
     check(
         f"has_{field}_usage",
         f"reports/page.tsx consumes aiReport.{field} array",
-        f"aiReport.{field}" in rpt or f".{field}" in rpt,
-        f"found={field in rpt}",
+        f"aiReport.{field}" in found or f".{field}" in found,
+        f"found={field in found}",
     )
 
 # ─── 5. AI tab functionality ────────────────────────────────────────────
@@ -101,68 +130,67 @@ for field in ["key_findings", "iocs", "mitre_attack", "recommendations"]:
 check(
     "has_ai_tab_switcher",
     "reports page has AI tab button",
-    "AI Analysis" in rpt and 'setActiveTab("ai")' in rpt,
-    f"found_tab={'AI Analysis' in rpt}",
+    "AI Analysis" in found and 'setActiveTab("ai")' in found,
+    f"found_tab={'AI Analysis' in found}",
 )
 
 check(
     "has_risk_score_display",
     "reports page displays risk score from AI report",
-    "risk_score" in rpt and "threat_level" in rpt,
-    f"risk_score={'risk_score' in rpt}, threat_level={'threat_level' in rpt}",
+    "risk_score" in found and "threat_level" in found,
+    f"risk_score={'risk_score' in found}, threat_level={'threat_level' in found}",
 )
 
 check(
     "has_mitre_mapping",
     "reports page renders MITRE ATT&CK mapping",
-    "MITRE" in rpt and "mitre_attack" in rpt,
-    f"mitre={'MITRE' in rpt}",
+    "MITRE" in found and "mitre_attack" in found,
+    f"mitre={'MITRE' in found}",
 )
 
 check(
     "has_ioc_table",
     "reports page renders IOC table",
-    "Indicators of Compromise" in rpt and "iocs" in rpt,
-    f"ioc={'Indicators of Compromise' in rpt}",
+    "Indicators of Compromise" in found and "iocs" in found,
+    f"ioc={'Indicators of Compromise' in found}",
 )
 
 check(
     "has_executive_summary",
     "reports page renders executive summary",
-    "executive_summary" in rpt and "Executive Summary" in rpt,
-    f"found={'Executive Summary' in rpt}",
+    "executive_summary" in found and "Executive Summary" in found,
+    f"found={'Executive Summary' in found}",
 )
 
 check(
     "has_recommendations",
     "reports page renders recommendations from AI",
-    "recommendations" in rpt and "Recommendations" in rpt,
-    f"found={'Recommendations' in rpt}",
+    "recommendations" in found and "Recommendations" in found,
+    f"found={'Recommendations' in found}",
 )
 
 check(
     "has_per_tool_results",
     "reports page shows per-tool agent results",
-    "tool_results" in rpt and "Per-Tool Agent" in rpt,
-    f"found={'Per-Tool Agent' in rpt}",
+    "tool_results" in found and "Per-Tool Agent" in found,
+    f"found={'Per-Tool Agent' in found}",
 )
 
 check(
     "has_auto_load_ai_report",
     "reports page auto-loads existing AI report when selecting a report",
-    "getAIReport(report.analysis_id)" in rpt or "getAIReport" in rpt,
-    f"found={'getAIReport' in rpt}",
+    "getAIReport(report.analysis_id)" in found or "getAIReport" in found,
+    f"found={'getAIReport' in found}",
 )
 
 # ─── 6. Preserved original report components ────────────────────────────
 
-for component in ["SysmonSection", "ProcmonSection", "NetworkSection", "HandleSection",
-                   "TcpvconSection", "ScreenshotGallery", "CollectorBadges"]:
+for component in PRESERVED_COMPONENTS:
     check(
         f"preserved_{component}",
         f"reports/page.tsx still has original {component}",
-        f"function {component}" in rpt,
-        f"found={'function ' + component in rpt}",
+        f"function {component}" in found,
+        f"found={'function ' + component in found}",
     )
 
 # ─── 7. Search functionality ────────────────────────────────────────────
@@ -170,8 +198,8 @@ for component in ["SysmonSection", "ProcmonSection", "NetworkSection", "HandleSe
 check(
     "has_search",
     "reports page has search/filter for report list",
-    "searchQuery" in rpt and "Search reports" in rpt,
-    f"found={'searchQuery' in rpt}",
+    "searchQuery" in found and "Search reports" in found,
+    f"found={'searchQuery' in found}",
 )
 
 # ─── Summary ─────────────────────────────────────────────────────────────
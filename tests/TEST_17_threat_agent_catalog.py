@@ -8,24 +8,22 @@ Validates:
   - XML schema references are present in each agent prompt
   - gpt-5-mini model constant is set correctly
   - get_agent_by_name / get_tool_agents helpers work
+  - validate_agent_reply enforces each agent's JSON reply contract
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import _bootstrap  # noqa: F401
 
 TEST_NAME = "TEST_17_threat_agent_catalog"
 ABOUT = "Threat intelligence agent catalog integrity and JSON prompt contracts"
 
-EXPECTED_TOOL_AGENTS = {
+EXPECTED_TOOL_AGENTS = frozenset({
     "sysmon-analyzer",
     "procmon-analyzer",
     "network-analyzer",
     "handle-analyzer",
     "tcpvcon-analyzer",
     "metadata-analyzer",
-}
+})
 
 EXPECTED_ALL_AGENTS = EXPECTED_TOOL_AGENTS | {"threat-summarizer"}
 
@@ -38,7 +36,7 @@ def run_test() -> bool:
         get_tool_agents,
         get_agent_by_name,
     )
-    from core.threatintelligence.copilot_service import REQUIRED_MODEL
+    from core.threatintelligence.copilot_service import REQUIRED_MODEL, validate_agent_reply
 
     errors = []
 
@@ -48,12 +46,14 @@ def run_test() -> bool:
 
     # 2. Check all expected agents exist
     all_names = {a.name for a in DEFAULT_THREATINTEL_AGENTS}
-    missing = EXPECTED_ALL_AGENTS - all_names
-    if missing:
-        errors.append(f"Missing agents: {missing}")
-    extra = all_names - EXPECTED_ALL_AGENTS
-    if extra:
-        errors.append(f"Unexpected agents: {extra}")
+    mismatched = all_names ^ EXPECTED_ALL_AGENTS
+    if mismatched:
+        missing = mismatched & EXPECTED_ALL_AGENTS
+        if missing:
+            errors.append(f"Missing agents: {missing}")
+        extra = mismatched - EXPECTED_ALL_AGENTS
+        if extra:
+            errors.append(f"Unexpected agents: {extra}")
 
     # 3. Check tool agents subset
     tool_names = {a.name for a in TOOL_AGENTS}
@@ -89,8 +89,21 @@ def run_test() -> bool:
     if summarizer:
         if '"risk_score"' not in summarizer.prompt:
             errors.append("Summarizer prompt missing risk_score JSON key")
-        if "risk_score" not in summarizer.prompt:
-            errors.append("Summarizer prompt missing risk_score")
+
+    # 8. Replies are validated against each agent's JSON contract
+    complete = ('{"tool": "sysmon", "verdict": "benign", "confidence": 90,'
+                ' "findings": [], "iocs": [], "summary": "ok"}')
+    reply_cases = [
+        ("complete tool reply", "sysmon-analyzer", complete, True),
+        ("missing keys", "sysmon-analyzer", '{"tool": "sysmon", "verdict": "benign"}', False),
+        ("tool reply to summarizer", "threat-summarizer", complete, False),
+        ("non-object JSON", "sysmon-analyzer", "[]", False),
+        ("prose", "sysmon-analyzer", "The sample looks benign.", False),
+    ]
+    for label, agent_name, text, want_valid in reply_cases:
+        _, error = validate_agent_reply(agent_name, text)
+        if (error is None) != want_valid:
+            errors.append(f"validate_agent_reply {label}: error={error!r}")
 
     return errors
 
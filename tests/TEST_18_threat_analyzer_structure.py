@@ -9,18 +9,68 @@ Validates:
   - ThreatAnalysisReport / ToolAnalysisResult serialization
   - _clean_json_response strips markdown fences
   - Normalization helpers produce correct shapes
+  - Agent reply cache skips the LLM on a hit and never stores failed turns
 """
 
-import sys
+import asyncio
 import os
 import json
+import tempfile
 
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from _bootstrap import ROOT
 
 TEST_NAME = "TEST_18_threat_analyzer_structure"
 ABOUT = "Threat analyzer module: data loaders, JSON parsing, report serialization"
 
 
+class _ScriptedService:
+    """Stand-in Copilot service that replays canned replies and counts calls."""
+
+    model = "gpt-5-mini"
+
+    def __init__(self, *replies: str) -> None:
+        self._replies = list(replies)
+        self.calls = 0
+
+    async def chat(self, *, agent_name: str, prompt: str, timeout: float = 120.0) -> dict:
+        self.calls += 1
+        return {"agent": agent_name, "prompt": prompt, "response": self._replies.pop(0)}
+
+
+def _check_reply_cache(ThreatAnalyzer, errors: list[str]) -> None:
+    """A fresh, valid reply is served from cache; a failed turn never is."""
+    valid = json.dumps({
+        "tool": "sysmon", "verdict": "benign", "confidence": 90,
+        "findings": [], "iocs": [], "summary": "Nothing notable.",
+    })
+    with tempfile.TemporaryDirectory(prefix="isolens_ai_cache_") as tmp:
+        def chat_twice(service, prompt):
+            analyzer = ThreatAnalyzer(reports_dir=tmp, copilot_service=service, cache_dir=tmp)
+
+            async def run():
+                first = await analyzer._chat(service, agent_name="sysmon-analyzer", prompt=prompt)
+                second = await analyzer._chat(service, agent_name="sysmon-analyzer", prompt=prompt)
+                return first, second
+            return asyncio.run(run())
+
+        service = _ScriptedService(valid)
+        first, second = chat_twice(service, "valid prompt")
+        if service.calls != 1 or second != first:
+            errors.append(f"Cache hit should skip service.chat: calls={service.calls}")
+
+        for label, reply in (
+            ("session error", "[session.error] rate limited"),
+            ("non-JSON", "I could not analyze this data."),
+        ):
+            before = set(os.listdir(tmp))
+            service = _ScriptedService(reply, valid)
+            first, second = chat_twice(service, f"{label} prompt")
+            if service.calls != 2 or first != reply or second != valid:
+                errors.append(f"{label} reply was served from cache: calls={service.calls}")
+            if len(set(os.listdir(tmp)) - before) != 1:
+                errors.append(f"{label} reply was written to the cache")
+
+
 def run_test() -> list[str]:
     from core.threatintelligence.threat_analyzer import (
         ThreatAnalyzer,
@@ -54,12 +104,14 @@ def run_test() -> list[str]:
         errors.append(f"ThreatAnalyzer() raised: {exc}")
 
     # 3. Test data loaders against existing report (if available)
-    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-    reports_dir = os.path.join(project_root, "core", "storage", "reports")
-    report_dirs = [d for d in os.listdir(reports_dir) if os.path.isdir(os.path.join(reports_dir, d))] if os.path.isdir(reports_dir) else []
+    reports_dir = os.path.join(ROOT, "core", "storage", "reports")
+    # Only the first report is loaded, so stop the scan at the first directory
+    sample_dir = None
+    if os.path.isdir(reports_dir):
+        with os.scandir(reports_dir) as it:
+            sample_dir = next((e.path for e in it if e.is_dir()), None)
 
-    if report_dirs:
-        sample_dir = os.path.join(reports_dir, report_dirs[0])
+    if sample_dir:
         for name, loader in TOOL_LOADERS.items():
             try:
                 payload, has_data = loader(sample_dir)
@@ -162,25 +214,19 @@ def run_test() -> list[str]:
     if "trojan" not in report.executive_summary.lower():
         errors.append(f"executive_summary missing 'trojan': {report.executive_summary}")
 
-    # 8. Normalization helpers
-    nf = _normalize_findings(["test finding"])
-    if not nf or nf[0].get("description") != "test finding":
-        errors.append(f"_normalize_findings string failed: {nf}")
-    nf2 = _normalize_findings([{"severity": "high", "description": "x"}])
-    if not nf2 or nf2[0].get("severity") != "high":
-        errors.append(f"_normalize_findings dict failed: {nf2}")
-
-    ni = _normalize_iocs(["bad.exe"])
-    if not ni or ni[0].get("value") != "bad.exe":
-        errors.append(f"_normalize_iocs string failed: {ni}")
-
-    nm = _normalize_mitre([{"technique_id": "T1059", "name": "Scripting"}])
-    if not nm or nm[0].get("id") != "T1059":
-        errors.append(f"_normalize_mitre technique_id->id failed: {nm}")
-
-    nr = _normalize_recommendations(["Do this"])
-    if not nr or nr[0].get("action") != "Do this":
-        errors.append(f"_normalize_recommendations string failed: {nr}")
+    # 8. Normalization helpers: (label, normalizer, input, key, expected first-item value)
+    normalizer_cases = [
+        ("_normalize_findings string", _normalize_findings, ["test finding"], "description", "test finding"),
+        ("_normalize_findings dict", _normalize_findings, [{"severity": "high", "description": "x"}], "severity", "high"),
+        ("_normalize_iocs string", _normalize_iocs, ["bad.exe"], "value", "bad.exe"),
+        ("_normalize_mitre technique_id->id", _normalize_mitre,
+         [{"technique_id": "T1059", "name": "Scripting"}], "id", "T1059"),
+        ("_normalize_recommendations string", _normalize_recommendations, ["Do this"], "action", "Do this"),
+    ]
+    for label, normalize, items, key, expected in normalizer_cases:
+        got = normalize(items)
+        if not got or got[0].get(key) != expected:
+            errors.append(f"{label} failed: {got}")
 
     # 9. Serialization round-trip
     report_dict = report.to_dict()
@@ -196,6 +242,15 @@ def run_test() -> list[str]:
     if result_dict.get("verdict") != "malicious":
         errors.append("ToolAnalysisResult.to_dict() verdict mismatch")
 
+    # ai_report.json is written by orjson straight from the dataclasses
+    import orjson
+    report.tool_results = [result, bad_result]
+    if orjson.dumps(report._serializable()) != orjson.dumps(report.to_dict()):
+        errors.append("Native report serialization differs from to_dict()")
+
+    # 10. Agent reply cache
+    _check_reply_cache(ThreatAnalyzer, errors)
+
     return errors
 
 
@@ -9,26 +9,19 @@ Validates:
   - ThreatAnalyzer.get_ai_report returns None for nonexistent report
 """
 
-import sys
-import os
-
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+import _bootstrap  # noqa: F401
 
 TEST_NAME = "TEST_19_ai_analysis_api_wiring"
 ABOUT = "AI analysis API endpoints exist with correct methods on the analysis router"
 
 
-def run_test() -> list[str]:
-    errors = []
-
-    # 1. Import analysis routes
+def _check_routes(errors: list[str]) -> None:
     try:
         from core.gateway.analysis_routes import router
     except Exception as exc:
         errors.append(f"Failed to import analysis_routes: {exc}")
-        return errors
+        return
 
-    # 2. Collect all routes
     routes = {}
     for route in router.routes:
         path = getattr(route, "path", None)
@@ -36,21 +29,20 @@ def run_test() -> list[str]:
         if path:
             routes[path] = methods
 
-    # 3. Check ai-analyze endpoint
     ai_analyze_path = "/api/analysis/report/{analysis_id}/ai-analyze"
     if ai_analyze_path not in routes:
         errors.append(f"Missing route: {ai_analyze_path}")
     elif "POST" not in routes[ai_analyze_path]:
         errors.append(f"Route {ai_analyze_path} should be POST, got {routes[ai_analyze_path]}")
 
-    # 4. Check ai-report endpoint
     ai_report_path = "/api/analysis/report/{analysis_id}/ai-report"
     if ai_report_path not in routes:
         errors.append(f"Missing route: {ai_report_path}")
     elif "GET" not in routes[ai_report_path]:
         errors.append(f"Route {ai_report_path} should be GET, got {routes[ai_report_path]}")
 
-    # 5. ThreatAnalyzer.get_ai_report for nonexistent
+
+def _check_analyzer(errors: list[str]) -> None:
     try:
         from core.threatintelligence.threat_analyzer import ThreatAnalyzer
         analyzer = ThreatAnalyzer()
@@ -60,20 +52,29 @@ def run_test() -> list[str]:
     except Exception as exc:
         errors.append(f"ThreatAnalyzer.get_ai_report raised: {exc}")
 
-    # 6. Verify model enforcement
+
+def _check_model_enforcement(errors: list[str]) -> None:
     try:
         from core.threatintelligence.copilot_service import REQUIRED_MODEL, ThreatIntelCopilotService
         if REQUIRED_MODEL != "gpt-5-mini":
             errors.append(f"REQUIRED_MODEL = {REQUIRED_MODEL!r}, expected 'gpt-5-mini'")
-        # Even if caller passes a different model, service should use gpt-5-mini
-        # (can't actually call Copilot in tests, just verify attribute)
-        svc = ThreatIntelCopilotService.__new__(ThreatIntelCopilotService)
-        svc.__init__(model="gpt-4o")
+        # Even if caller passes a different model, service should use gpt-5-mini.
+        # Construction is offline (the client starts in __aenter__), so this
+        # only inspects the attribute and never calls Copilot.
+        svc = ThreatIntelCopilotService(model="gpt-4o")
         if svc.model != "gpt-5-mini":
             errors.append(f"Service model = {svc.model!r} after passing 'gpt-4o', expected 'gpt-5-mini'")
     except Exception as exc:
         errors.append(f"Model enforcement check failed: {exc}")
 
+
+def run_test() -> list[str]:
+    # Each group imports only what it checks, so a broken gateway import
+    # still lets the analyzer and model checks run and report.
+    errors = []
+    _check_routes(errors)
+    _check_analyzer(errors)
+    _check_model_enforcement(errors)
     return errors
 
 
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""TEST_20 — Report file serving and screenshot listing.
+
+Validates against a temporary reports directory (no VM needed):
+  - serve_report_file returns an ETag and honours If-None-Match (304)
+  - list_screenshots returns an ETag and honours If-None-Match (304)
+  - Screenshot listing only includes image extensions (case-insensitive)
+  - serve_report_file rejects paths escaping the report directory
+"""
+
+import json
+import os
+import shutil
+import tempfile
+
+import _bootstrap  # noqa: F401
+
+TEST_NAME = "TEST_20_report_file_serving"
+ABOUT = "Report file serving: ETag / 304 handling, screenshot filtering, traversal guard"
+
+
+def run_test(tmp: str) -> tuple[list[str], dict]:
+    from fastapi.testclient import TestClient
+
+    import core.gateway.analysis_routes as routes
+    from core.gateway.app import app
+
+    errors: list[str] = []
+    output: dict = {}
+
+    analysis_id = "20260301_120000_abcd1234"
+    ss_dir = os.path.join(tmp, analysis_id, "screenshots")
+    os.makedirs(ss_dir)
+    with open(os.path.join(ss_dir, "screenshot_000.PNG"), "wb") as f:
+        f.write(b"\x89PNG fake")
+    with open(os.path.join(ss_dir, "notes.txt"), "w") as f:
+        f.write("not an image")
+
+    routes.DEFAULT_REPORTS_DIR = tmp
+    routes._REPORTS_ROOT = os.path.realpath(tmp)
+    client = TestClient(app)
+
+    # 1. File serving ETag round-trip
+    url = f"/api/analysis/report/{analysis_id}/file/screenshots/screenshot_000.PNG"
+    resp = client.get(url)
+    etag = resp.headers.get("etag")
+    output["file_status"] = resp.status_code
+    output["file_etag"] = etag
+    if resp.status_code != 200 or not etag:
+        errors.append(f"File GET returned {resp.status_code}, etag={etag!r}")
+    else:
+        cached = client.get(url, headers={"If-None-Match": etag})
+        output["file_conditional_status"] = cached.status_code
+        if cached.status_code != 304:
+            errors.append(f"Conditional file GET returned {cached.status_code}, expected 304")
+
+    # 2. Screenshot listing ETag round-trip + extension filter
+    list_url = f"/api/analysis/report/{analysis_id}/screenshots"
+    resp = client.get(list_url)
+    listed = resp.json().get("data", {}).get("screenshots")
+    etag = resp.headers.get("etag")
+    output["listed"] = listed
+    output["list_etag"] = etag
+    if listed != ["screenshot_000.PNG"]:
+        errors.append(f"Screenshot listing mismatch: {listed}")
+    if not etag:
+        errors.append("Screenshot listing missing ETag header")
+    else:
+        cached = client.get(list_url, headers={"If-None-Match": etag})
+        output["list_conditional_status"] = cached.status_code
+        if cached.status_code != 304:
+            errors.append(f"Conditional listing returned {cached.status_code}, expected 304")
+
+    # 3. Path traversal is rejected (encoded so the client doesn't collapse it)
+    for evil in ("%2e%2e/%2e%2e/etc/passwd", "screenshots/%2e%2e/%2e%2e/other/x.png"):
+        resp = client.get(f"/api/analysis/report/{analysis_id}/file/{evil}")
+        output[f"traversal:{evil}"] = resp.status_code
+        if resp.status_code != 400:
+            errors.append(f"Traversal {evil!r} returned {resp.status_code}, expected 400")
+
+    return errors, output
+
+
+def main() -> int:
+    tmp = tempfile.mkdtemp(prefix="isolens_test_reports_")
+    try:
+        errors, output = run_test(tmp)
+        if errors:
+            print(f"[{TEST_NAME}] FAIL")
+            print(f"About: {ABOUT}")
+            print(f"Reason: {len(errors)} check(s) failed")
+            print("Output:")
+            print("\n".join(errors))
+            print(json.dumps(output, indent=2))
+            return 1
+        print(f"[{TEST_NAME}] PASS")
+        print(f"About: {ABOUT}")
+        print("Output:")
+        print(json.dumps(output, indent=2))
+        return 0
+    except Exception as exc:
+        print(f"[{TEST_NAME}] FAIL")
+        print(f"About: {ABOUT}")
+        print(f"Reason: Exception — {exc}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
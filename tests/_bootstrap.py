@@ -0,0 +1,55 @@
+"""Shared preamble for the tests/TEST_*.py scripts.
+
+Each test is still a standalone script; running one puts tests/ first on
+sys.path, so ``import _bootstrap`` works from any of them.  Importing this
+module resolves the project root once and makes ``core.*`` importable, and
+provides the few helpers several scripts need.
+
+Nothing from ``core`` is imported here; each test imports what it uses.
+Every test runs in its own interpreter, so eagerly importing the gateway
+here would only slow down the tests that never touch it.
+"""
+
+import functools
+import inspect
+import os
+import sys
+
+import orjson
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@functools.lru_cache(maxsize=None)
+def source_of(obj) -> str:
+    """inspect.getsource(obj), read and tokenized once per object."""
+    return inspect.getsource(obj)
+
+
+def param_names(fn) -> tuple:
+    """Names of *fn*'s parameters, read off its code object.
+
+    Cheaper than inspect.signature when only membership matters: no
+    Parameter objects are built and annotations are never evaluated.
+    """
+    code = inspect.unwrap(fn).__code__
+    return code.co_varnames[:code.co_argcount + code.co_kwonlyargcount]
+
+
+@functools.lru_cache(maxsize=None)
+def _read_text(path: str) -> str:
+    with open(path, "r") as f:
+        return f.read()
+
+
+def read_text(path: str) -> str:
+    """Contents of the text file at *path*, read from disk once per process."""
+    return _read_text(os.path.abspath(path))
+
+
+def dumps(obj, indent=False) -> str:
+    """*obj* as JSON text for a test's Output block; unknown types via str()."""
+    option = orjson.OPT_INDENT_2 if indent else 0
+    return orjson.dumps(obj, option=option, default=str).decode()